@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.get_history.database import HistoryDatabase
+from src.get_history.orchestrator import HistoryOrchestrator
+from src.get_odds.database import OddsDatabase
+from src.get_odds.orchestrator import OddsOrchestrator
+from src.shared.config.settings import settings
+from src.shared.core.bet365_client import Bet365Client
+from src.shared.core.cassette import MANIFEST, ReplayTransport, cassette_path
+from src.shared.core.response_cache import ResponseCache
+from src.shared.services.rate_limiter import RateLimiter
+from src.shared.utils.logging_config import setup_logging
+
+SAMPLES_DIR = Path(__file__).parent.parent / "results" / "raw_api"
+
+
+def seed_synthetic_corpus(directory: Path, events_per_day: int, days_ahead: int, days_back: int):
+    """
+    Gera um corpus a partir das amostras em results/raw_api: `upcoming` com
+    eventos sintéticos por dia e `prematch`/`result` padrão para qualquer id.
+    """
+    samples = {
+        kind: sorted(SAMPLES_DIR.glob(f"*.{kind}.json"))[-1]
+        for kind in ("upcoming", "prematch", "result")
+    }
+    template = json.loads(samples["upcoming"].read_text())
+    if "results" in template:
+        template = template["results"][0]
+
+    directory.mkdir(parents=True, exist_ok=True)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    (directory / MANIFEST).write_text(json.dumps({"recorded_at": today.strftime("%Y%m%d")}))
+
+    for offset in range(-days_back, days_ahead + 1):
+        day = today + timedelta(days=offset)
+        results = []
+        for n in range(events_per_day):
+            event_id = f"9{offset + 100:03d}{n:05d}"
+            kickoff = day + timedelta(hours=12, minutes=(n * 10) % 600)
+            results.append(
+                {
+                    **template,
+                    "id": event_id,
+                    "time": str(int(kickoff.timestamp())),
+                    "time_status": "3" if offset < 0 else "0",
+                    "home": {"id": f"{event_id}1", "name": f"Home {event_id}"},
+                    "away": {"id": f"{event_id}2", "name": f"Away {event_id}"},
+                }
+            )
+        path = cassette_path(
+            directory, "v1/bet365/upcoming", {"sport_id": "151", "day": day.strftime("%Y%m%d")}
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"success": 1, "results": results}))
+
+    for kind, endpoint in (("prematch", "v3/bet365/prematch"), ("result", "v1/bet365/result")):
+        path = cassette_path(directory, endpoint, {})
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(samples[kind].read_bytes())
+
+
+def count_rows(db_path, tables):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tables}
+    finally:
+        conn.close()
+
+
+def make_cache(args, data_dir: Path):
+    """Cache HTTP isolado no diretório temporário (ou desligado)"""
+    if not args.cache:
+        return False
+    return ResponseCache(
+        data_dir / "http_cache.db",
+        ttls={"v1/bet365/upcoming": settings.HTTP_CACHE_TTL_UPCOMING},
+        revalidate=("v3/bet365/prematch", "v1/bet365/result"),
+        stale_seconds=settings.HTTP_CACHE_STALE,
+    )
+
+
+async def run_cycle(args, data_dir: Path) -> dict:
+    transport = ReplayTransport(
+        args.cassettes,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    # Cota folgada: mede o pipeline, não a espera do rate limit
+    rate_limiter = RateLimiter(max_requests=10**9, burst=10**9 - 1)
+
+    odds = OddsOrchestrator(
+        db=OddsDatabase(data_dir=data_dir),
+        client=Bet365Client(
+            rate_limiter=rate_limiter, transport=transport, cache=make_cache(args, data_dir)
+        ),
+        rate_limiter=rate_limiter,
+    )
+    history = HistoryOrchestrator(
+        db=HistoryDatabase(data_dir / "lol_history.db"),
+        client=Bet365Client(
+            rate_limiter=rate_limiter, transport=transport, cache=make_cache(args, data_dir)
+        ),
+        rate_limiter=rate_limiter,
+    )
+
+    timings = {}
+    start = time.perf_counter()
+    odds.loop_monitor.start()
+    try:
+        await odds.run_cycle()
+    finally:
+        await odds.loop_monitor.stop()
+        await odds.client.close()
+    timings["odds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await history.run(days_back=args.days_back)
+    timings["history"] = time.perf_counter() - start
+
+    cache_reports = [
+        client.cache.report() for client in (odds.client, history.client) if client.cache
+    ]
+    requests = sum(
+        h.count
+        for client in (odds.client, history.client)
+        for h in client.metrics.latency.values()
+    )
+    return {
+        "timings": timings,
+        "requests": requests,
+        "replay": transport.stats,
+        "cache": cache_reports,
+        "loop_lag": {"odds": odds.loop_monitor.report(), "history": history.loop_monitor.report()},
+        "odds_rows_written": odds.odds_service.write_stats["rows"],
+        "odds_db": count_rows(odds.db.db_path, ["events", "current_odds", "odds_history"]),
+        "history_db": count_rows(
+            history.db.db_path, ["matches", "game_maps", "map_statistics"]
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ciclo completo odds + histórico contra respostas gravadas"
+    )
+    parser.add_argument("--cassettes", default=settings.BET365_CASSETTE_DIR)
+    parser.add_argument("--latency", type=float, default=0.05, help="segundos por requisição")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days-back", type=int, default=2)
+    parser.add_argument(
+        "--cache", action="store_true", help="usa o cache HTTP (arquivo temporário)"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=1, help="ciclos seguidos sobre os mesmos bancos"
+    )
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        metavar="N",
+        help="gera antes um corpus sintético com N eventos por dia (a partir de results/raw_api)",
+    )
+    args = parser.parse_args()
+
+    # Só avisos no console: o relatório final é o que interessa
+    for name in ("lol_odds", "lol_history"):
+        setup_logging(name, log_dir=Path(tempfile.gettempdir()) / "bench_logs").setLevel(
+            logging.WARNING
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if args.synthetic:
+            args.cassettes = tmp / "cassettes"
+            seed_synthetic_corpus(args.cassettes, args.synthetic, 10, args.days_back)
+
+        for run in range(1, args.runs + 1):
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = asyncio.run(run_cycle(args, tmp / "data"))
+            wall = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print_report(run, wall, peak, result)
+
+
+def print_report(run: int, wall: float, peak: int, result: dict):
+    print("\n" + "=" * 60)
+    print(f"🏁 Ciclo {run}")
+    print(f"⏱️  Tempo total: {wall:.2f}s (odds {result['timings']['odds']:.2f}s, "
+          f"histórico {result['timings']['history']:.2f}s)")
+    print(f"📡 Requisições: {result['requests']} "
+          f"(replay: {result['replay']['hits']} gravadas, {result['replay']['misses']} ausentes, "
+          f"{result['replay']['errors']} erros injetados)")
+    for report in result["cache"]:
+        print(f"♻️  {report}")
+    print(f"📝 Linhas de odds gravadas: {result['odds_rows_written']:,}")
+    print(f"💾 Odds: {result['odds_db']}")
+    print(f"💾 Histórico: {result['history_db']}")
+    print(f"🧠 Pico de memória (tracemalloc): {peak / 1024 / 1024:.1f} MB")
+    for stage, report in result["loop_lag"].items():
+        print(f"🔁 {stage}: {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.shared.services.rate_limiter import RateLimiter
+
+
+class ListRateLimiter:
+    """Implementação anterior (lista de timestamps), mantida só para comparação"""
+
+    def __init__(self, max_requests=3500, time_window=3600):
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.requests = []
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            now = time.time()
+            self.requests = [
+                req_time
+                for req_time in self.requests
+                if now - req_time < self.time_window
+            ]
+
+            if len(self.requests) >= self.max_requests:
+                oldest_req = min(self.requests)
+                wait_time = self.time_window - (now - oldest_req)
+                if wait_time > 0:
+                    await asyncio.sleep(wait_time)
+                    now = time.time()
+                    self.requests = [
+                        req_time
+                        for req_time in self.requests
+                        if now - req_time < self.time_window
+                    ]
+
+            self.requests.append(now)
+
+
+async def run(limiter, acquires: int, concurrency: int) -> float:
+    queue = iter(range(acquires))
+
+    async def worker():
+        for _ in queue:
+            await limiter.acquire()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara o custo de acquire() entre os rate limiters"
+    )
+    parser.add_argument("--acquires", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    # Cota maior que o número de chamadas: mede só o overhead, sem esperas
+    quota = args.acquires * 2
+    with tempfile.TemporaryDirectory() as tmp:
+        limiters = {
+            "lista (anterior)": ListRateLimiter(max_requests=quota),
+            "token bucket": RateLimiter(max_requests=quota, burst=quota - 1),
+            "token bucket (SQLite)": RateLimiter(
+                max_requests=quota,
+                burst=quota - 1,
+                shared_path=os.path.join(tmp, "rate_limit.db"),
+            ),
+        }
+
+        print(f"⏱️  {args.acquires:,} acquires, {args.concurrency} tarefas concorrentes")
+        for label, limiter in limiters.items():
+            elapsed = asyncio.run(run(limiter, args.acquires, args.concurrency))
+            print(
+                f"  {label:<24} {elapsed:8.3f}s  "
+                f"{elapsed / args.acquires * 1e6:9.1f} µs/acquire"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.get_history.database import HistoryDatabase
+
+
+# FROM/JOIN <nome> [AS] [apelido]
+SOURCE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+KEYWORDS = {"where", "join", "on", "left", "inner", "cross", "order", "group", "limit", "using"}
+
+
+def table_aliases(query: str) -> dict[str, str]:
+    """Nome usado no plano -> nome na consulta (tabela, CTE ou apelido)"""
+    aliases = {}
+    for name, alias in SOURCE.findall(query):
+        aliases[name] = name
+        if alias and alias.lower() not in KEYWORDS:
+            aliases[alias] = name
+    return aliases
+
+
+def full_scans(plan: list[str], query: str, tables: set[str]) -> list[str]:
+    """
+    Passos do plano que percorrem uma tabela (ou índice) inteira. Varrer CTEs
+    e subconsultas (SCAN rm, SCAN (subquery-N)) é esperado e não conta.
+    """
+    aliases = table_aliases(query)
+    return [
+        step
+        for step in plan
+        if step.startswith("SCAN ")
+        and aliases.get(step.split()[1], step.split()[1]) in tables
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Falha se alguma consulta quente do lol_history.db cair em full scan"
+    )
+    parser.add_argument("--db", default="data/lol_history.db")
+    parser.add_argument("-v", "--verbose", action="store_true", help="mostra o plano completo")
+    args = parser.parse_args()
+
+    # Abrir pelo HistoryDatabase aplica a migração de índices antes da checagem
+    db = HistoryDatabase(args.db)
+
+    with sqlite3.connect(args.db) as conn:
+        tables = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+
+    failures = 0
+    for name, plan in db.explain_hot_queries().items():
+        scans = full_scans(plan, db.HOT_QUERIES[name][0], tables)
+        print(f"{'❌' if scans else '✅'} {name}")
+        for step in plan if args.verbose else scans:
+            print(f"     {step}")
+        failures += bool(scans)
+
+    if failures:
+        print(f"\n{failures} consulta(s) com full scan")
+        sys.exit(1)
+    print("\nNenhum full scan nas consultas quentes")
+
+
+if __name__ == "__main__":
+    main()
@@ -359,6 +359,7 @@ class BetVerificationSystem:
             raise
         finally:
             # Limpeza
+            connection_pool.log_stats()
             connection_pool.close_all()
             cache_manager.clear()
 
@@ -0,0 +1,35 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.get_odds.database import OddsDatabase
+from src.get_odds.services.odds_service import OddsService
+from src.shared.utils.logging_config import setup_logging
+
+setup_logging("lol_odds", log_dir=Path(__file__).parent.parent / "logs")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reescreve current_odds.raw_data para a política indicada"
+    )
+    parser.add_argument("policy", choices=OddsService.RAW_POLICIES)
+    args = parser.parse_args()
+
+    db = OddsDatabase()
+    size_before = os.path.getsize(db.db_path)
+
+    service = OddsService(db, client=None, rate_limiter=None, raw_policy=args.policy)
+    service.migrate_raw_data(args.policy)
+
+    size_after = os.path.getsize(db.db_path)
+    print(
+        f"💾 {db.db_path}: {size_before / 1024 / 1024:.2f} MB → {size_after / 1024 / 1024:.2f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
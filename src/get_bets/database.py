@@ -3,6 +3,7 @@ from datetime import datetime
 from pathlib import Path
 
 from src.get_bets.models.bet import Bet, Event
+from src.shared.services.team_registry import TeamRegistry
 
 
 class BetsDatabase:
@@ -10,6 +11,7 @@ class BetsDatabase:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.setup_database()  # Criar tabelas ao inicializar
+        self.teams = TeamRegistry.for_database(self.db_path)
 
     def setup_database(self):
         """Cria as tabelas necessárias se não existirem"""
@@ -130,25 +132,28 @@ class BetsDatabase:
 
     def get_or_create_team(self, team_id: str, team_name: str) -> int:
         """Busca ou cria um time, retorna o ID interno"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT id FROM teams WHERE team_id = ?",
-                (team_id,)
-            )
-            row = cursor.fetchone()
-            
-            if row:
-                return row[0]
-            
-            # Criar novo time
-            cursor = conn.execute(
-                """
-                INSERT INTO teams (team_id, name, created_at, updated_at)
-                VALUES (?, ?, ?, ?)
-                """,
-                (team_id, team_name, datetime.now().isoformat(), datetime.now().isoformat())
-            )
-            return cursor.lastrowid
+        return self.get_or_create_teams({team_id: team_name})[team_id]
+
+    def get_or_create_teams(self, teams: dict) -> dict:
+        """Busca ou cria vários times ({team_id: nome}), retorna {team_id: ID interno}"""
+        now = datetime.now().isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                return self.teams.resolve_many(
+                    conn,
+                    (
+                        {
+                            "team_id": team_id,
+                            "name": team_name,
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                        for team_id, team_name in teams.items()
+                    ),
+                )
+        except Exception:
+            self.teams.invalidate()
+            raise
 
     def insert_bet(self, bet) -> int:
         """Insere uma nova aposta - aceita objeto Bet ou dicionário"""
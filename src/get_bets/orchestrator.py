@@ -110,14 +110,16 @@ class BetsOrchestrator:
             return
         
         # Criar ou buscar times
-        home_team_id = self.db.get_or_create_team(
-            str(event_info["home_team_id"]),
-            event_info["home_team_name"]
-        )
-        away_team_id = self.db.get_or_create_team(
-            str(event_info["away_team_id"]),
-            event_info["away_team_name"]
+        home_key = str(event_info["home_team_id"])
+        away_key = str(event_info["away_team_id"])
+        team_ids = self.db.get_or_create_teams(
+            {
+                home_key: event_info["home_team_name"],
+                away_key: event_info["away_team_name"],
+            }
         )
+        home_team_id = team_ids[home_key]
+        away_team_id = team_ids[away_key]
         
         # Criar evento
         event = Event(
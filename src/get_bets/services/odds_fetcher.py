@@ -2,6 +2,7 @@ import sqlite3
 from pathlib import Path
 
 from src.get_bets.models.bet import BettingLine
+from src.shared.core.database import read_only_connection
 
 
 class OddsFetcher:
@@ -12,7 +13,7 @@ class OddsFetcher:
     
     def get_available_events(self) -> list[str]:
         """Retorna IDs de eventos com odds de Totals disponíveis"""
-        with sqlite3.connect(self.db_path) as conn:
+        with read_only_connection(self.db_path) as conn:
             cursor = conn.execute(
                 """
                 SELECT DISTINCT event_id
@@ -25,7 +26,7 @@ class OddsFetcher:
     
     def get_event_info(self, event_id: str) -> dict | None:
         """Busca informações do evento (times, liga, data)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with read_only_connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             
             # Buscar evento
@@ -72,7 +73,7 @@ class OddsFetcher:
         
         betting_lines = []
         
-        with sqlite3.connect(self.db_path) as conn:
+        with read_only_connection(self.db_path) as conn:
             for market_type in market_types:
                 # Determinar odds_type baseado no market
                 if "Map 1" in market_type:
@@ -0,0 +1,98 @@
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from src.get_bets.services.totals_evaluator import SIDE_OVER, SIDE_UNDER
+
+# Limites de probabilidade usados pelos utilitários da BettingStrategy
+P_MIN = 1e-6
+P_MAX = 1 - 1e-6
+
+
+class PlayerEvaluation(NamedTuple):
+    """Resultado por seleção (arrays alinhados com as seleções de entrada)"""
+
+    hit_rate_10: np.ndarray
+    hit_rate_20: np.ndarray
+    p_prior: np.ndarray
+    p_like: np.ndarray
+    p_real: np.ndarray
+    fair_odds: np.ndarray
+    roi: np.ndarray
+    ev_percent: np.ndarray
+
+
+class PlayerMarketEvaluator:
+    """
+    Avalia todas as seleções de players de um evento de uma vez.
+
+    Os últimos 20 valores de cada seleção viram uma linha de uma matriz
+    preenchida com NaN; hit rates de 10 e 20 jogos, posterior, fair odds,
+    ROI e EV saem por broadcast. Mesmas contas (e na mesma ordem) do loop
+    antigo com `_calc_window_stats`, `_posterior`, `_fair_from_p` e
+    `_ev_percent`, então os números batem exatamente.
+    """
+
+    WINDOWS = (10, 20)
+
+    def __init__(self, w_prior: float = 0.5):
+        self.w_prior = w_prior
+
+    def history_matrix(self, histories: Sequence[np.ndarray]):
+        """(valores, contagens) com os últimos 20 jogos de cada seleção"""
+        width = max(self.WINDOWS)
+        values = np.full((len(histories), width), np.nan)
+        counts = np.zeros(len(histories))
+        for i, history in enumerate(histories):
+            recent = history[:width]
+            values[i, : len(recent)] = recent
+            counts[i] = len(recent)
+        return values, counts
+
+    def _hit_rates(self, values, counts, sides, handicaps, window):
+        rows = values[:, :window]
+        threshold = handicaps[:, None]
+        hits = np.where(
+            sides[:, None] == SIDE_OVER,
+            rows > threshold,
+            np.where(sides[:, None] == SIDE_UNDER, rows < threshold, False),
+        ).sum(axis=1)
+        n = np.minimum(counts, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(n > 0, hits / n, np.nan)
+
+    def evaluate(
+        self,
+        histories: Sequence[np.ndarray],
+        sides: Sequence[int],
+        handicaps: Sequence[float],
+        odds: Sequence[float],
+    ) -> PlayerEvaluation:
+        sides = np.asarray(sides, dtype=np.int8)
+        handicaps = np.asarray(handicaps, dtype=float)
+        odds = np.asarray(odds, dtype=float)
+        values, counts = self.history_matrix(histories)
+
+        hit_rate_10 = self._hit_rates(values, counts, sides, handicaps, 10)
+        hit_rate_20 = self._hit_rates(values, counts, sides, handicaps, 20)
+
+        p_prior = np.clip(1.0 / np.maximum(odds, 1e-12), P_MIN, P_MAX)
+        p_like = 0.6 * hit_rate_10 + 0.4 * hit_rate_20
+        p_real = self.w_prior * np.clip(p_prior, P_MIN, P_MAX) + (
+            1.0 - self.w_prior
+        ) * np.clip(p_like, P_MIN, P_MAX)
+        p_real_clipped = np.clip(p_real, P_MIN, P_MAX)
+        fair_odds = 1.0 / p_real_clipped
+        roi = (odds / fair_odds - 1.0) * 100.0
+        ev_percent = (p_real_clipped * odds - 1.0) * 100.0
+
+        return PlayerEvaluation(
+            hit_rate_10=hit_rate_10,
+            hit_rate_20=hit_rate_20,
+            p_prior=p_prior,
+            p_like=p_like,
+            p_real=p_real,
+            fair_odds=fair_odds,
+            roi=roi,
+            ev_percent=ev_percent,
+        )
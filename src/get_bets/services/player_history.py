@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# teamname ausente no CSV (não coincide com nenhum nome de time real)
+_NO_TEAM = "\0"
+
+
+class PlayerHistoryIndex:
+    """
+    Índice do histórico de players (database.csv) montado uma vez por carga.
+
+    Para cada (player, time) e stat guarda um trecho contíguo de um array
+    NumPy, sem NaN e ordenado por data decrescente: buscar os últimos n
+    valores vira um slice. O time mais frequente de cada player fica
+    pré-calculado para o fallback de `StatisticalStrategy._get_player_values`.
+    """
+
+    STATS = ("kills", "deaths", "assists")
+
+    def __init__(self, df: pd.DataFrame, stats=STATS):
+        df = df[df["playername"].notna()]
+        players = df["playername"].to_numpy(dtype=object)
+        teamname = df["teamname"].astype(object)
+        teams = teamname.where(teamname.notna(), _NO_TEAM).to_numpy(dtype=object)
+
+        keys = pd.MultiIndex.from_arrays([players, teams])
+        codes, uniques = pd.factorize(keys)
+        self._groups: Dict[Tuple[str, str], int] = {key: i for i, key in enumerate(uniques)}
+
+        # Data decrescente com datas vazias no fim, dentro de cada (player, time)
+        date_rank = (
+            df["date"]
+            .rank(method="dense", ascending=False, na_option="bottom")
+            .to_numpy()
+        )
+        order = np.lexsort((date_rank, codes))
+        sorted_codes = codes[order]
+        group_ids = np.arange(len(uniques))
+
+        self._values: Dict[str, np.ndarray] = {}
+        self._bounds: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for stat in stats:
+            values = pd.to_numeric(df[stat], errors="coerce").to_numpy(dtype=float)[order]
+            keep = ~np.isnan(values)
+            stat_codes = sorted_codes[keep]
+            self._values[stat] = values[keep]
+            self._bounds[stat] = (
+                np.searchsorted(stat_codes, group_ids, side="left"),
+                np.searchsorted(stat_codes, group_ids, side="right"),
+            )
+
+        # Time mais frequente por player (empate: ordem alfabética, como o groupby)
+        rows_per_group = np.bincount(codes, minlength=len(uniques))
+        best: Dict[str, Tuple[int, str]] = {}
+        for (player, team), count in zip(uniques, rows_per_group):
+            if team == _NO_TEAM:
+                continue
+            current = best.get(player)
+            if current is None or count > current[0] or (count == current[0] and team < current[1]):
+                best[player] = (count, team)
+        self._main_team: Dict[str, str] = {player: team for player, (_, team) in best.items()}
+
+        self.players: List[str] = list(pd.unique(players))
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def main_team(self, player: str) -> Optional[str]:
+        """Time em que o player mais jogou (None se nunca teve time)"""
+        return self._main_team.get(player)
+
+    def values(self, player: str, team: Optional[str], stat: str, n: int = 50) -> np.ndarray:
+        """
+        Últimos n valores do player no time; sem registros nesse time usa o
+        time mais frequente do player (ou as linhas sem time, se só houver essas).
+        """
+        group = self._groups.get((player, team)) if team is not None else None
+        if group is None:
+            fallback = self._main_team.get(player, _NO_TEAM)
+            group = self._groups.get((player, fallback))
+            if group is None:
+                return np.array([])
+
+        starts, ends = self._bounds[stat]
+        start = starts[group]
+        return self._values[stat][start : min(ends[group], start + n)]
@@ -0,0 +1,100 @@
+from typing import Dict, Iterable, List, Optional
+
+
+class PlayerNameMatcher:
+    """
+    Acha o nome do jogador dentro do selection_name com a mesma regra do
+    `BettingStrategy._extract_player`: primeiro o nome inteiro entre espaços,
+    depois como substring; em cada etapa vence o nome mais longo e, no empate,
+    o que aparece antes na lista de candidatos.
+
+    Montado uma vez por lista de candidatos. A etapa de palavras consulta um
+    dicionário com cada sequência de palavras da seleção; a de substring
+    percorre a seleção uma vez num autômato Aho–Corasick com todos os nomes.
+    """
+
+    def __init__(self, candidates: Iterable[str]):
+        self.candidates: List[str] = list(candidates)
+
+        # Posição de cada nome na ordem de prioridade do _extract_player
+        # (sorted é estável: empate de tamanho mantém a ordem original)
+        by_priority = sorted(self.candidates, key=len, reverse=True)
+        self._names = by_priority
+        self._rank: Dict[str, int] = {}
+        for rank, name in enumerate(by_priority):
+            self._rank.setdefault(name.lower(), rank)
+        self._max_words = max((key.count(" ") + 1 for key in self._rank), default=0)
+
+        self._build_automaton()
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def restrict(self, names: Iterable[str]) -> "PlayerNameMatcher":
+        """Matcher só com os candidatos em `names`, na ordem original"""
+        allowed = set(names)
+        return PlayerNameMatcher(c for c in self.candidates if c in allowed)
+
+    def match(self, selection_name, substring: bool = True) -> Optional[str]:
+        """Nome casado (None se nenhum); `substring=False` fica só no nome inteiro"""
+        low = str(selection_name).lower()
+        rank = self._word_match(low)
+        if rank is None and substring:
+            rank = self._substring_match(low)
+        return None if rank is None else self._names[rank]
+
+    def _word_match(self, low: str) -> Optional[int]:
+        # " nome " in " seleção " <=> nome == " ".join(words[i:j]) para algum i < j
+        words = low.split(" ")
+        best = None
+        for i in range(len(words)):
+            for j in range(i + 1, min(i + self._max_words, len(words)) + 1):
+                rank = self._rank.get(" ".join(words[i:j]))
+                if rank is not None and (best is None or rank < best):
+                    best = rank
+        return best
+
+    def _build_automaton(self):
+        # Trie com links de falha; _best[s] = menor rank entre os nomes que
+        # terminam no estado s ou em algum sufixo dele
+        goto: List[Dict[str, int]] = [{}]
+        best: List[Optional[int]] = [None]
+        for key, rank in self._rank.items():
+            state = 0
+            for ch in key:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    best.append(None)
+                state = nxt
+            best[state] = rank
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                queue.append(nxt)
+            own, inherited = best[state], best[fail[state]]
+            if inherited is not None and (own is None or inherited < own):
+                best[state] = inherited
+
+        self._goto, self._fail, self._best = goto, fail, best
+
+    def _substring_match(self, low: str) -> Optional[int]:
+        goto, fail, best_at = self._goto, self._fail, self._best
+        best = best_at[0]  # nome vazio casa com qualquer seleção
+        state = 0
+        for ch in low:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            rank = best_at[state]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+        return best
@@ -1,32 +1,108 @@
 import logging
+import os
 import sqlite3
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 from colorama import Back, Fore, Style, init
 
+from src.get_bets.services.totals_evaluator import TotalsEvaluation, TotalsEvaluator
+from src.shared.core.database import get_read_only_connection
+from src.shared.core.history_queries import STAT_TYPES, query_team_map_totals
+
 logger = logging.getLogger("lol_bets")
 
+HISTORY_DB_PATH = "data/lol_history.db"
+
+
+class TeamStatsMemo:
+    """
+    Memo dos totais históricos por (time, stat, limite, corte de data).
+
+    O corte de 60 dias é fixado quando o memo é (re)iniciado, então todas as
+    linhas de uma execução usam a mesma janela. Se o lol_history.db mudar
+    (mtime/tamanho do arquivo ou do WAL) o memo é descartado.
+    """
+
+    def __init__(self, db_path: str = HISTORY_DB_PATH, days_back: int = 60):
+        self.db_path = db_path
+        self.days_back = days_back
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple[str, str, int, str], List[float]] = {}
+        self._signature = None
+        self.cutoff = None
+
+    def _history_signature(self) -> Tuple:
+        signature = []
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def invalidate(self):
+        self._entries.clear()
+        self._signature = None
+        self.cutoff = None
+
+    def _check_fresh(self):
+        signature = self._history_signature()
+        if signature != self._signature:
+            self._entries.clear()
+            self._signature = signature
+            # Mesmo formato de datetime('now', '-60 days') (UTC)
+            self.cutoff = (datetime.utcnow() - timedelta(days=self.days_back)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+
+    def get(
+        self,
+        team_name: str,
+        stat_type: str,
+        limit: int,
+        loader: Callable[[str, int, str], Dict[str, List[float]]],
+    ) -> List[float]:
+        """
+        Totais memorizados; num miss `loader(time, limite, corte)` devolve
+        todas as stats do time de uma vez e todas ficam guardadas.
+        """
+        self._check_fresh()
+        key = (team_name, stat_type, limit, self.cutoff)
+        if key in self._entries:
+            self.hits += 1
+            return list(self._entries[key])
+
+        self.misses += 1
+        for loaded_stat, values in loader(team_name, limit, self.cutoff).items():
+            self._entries[(team_name, loaded_stat, limit, self.cutoff)] = values
+        return list(self._entries.setdefault(key, []))
+
+
 class ROIAnalyzer:
     def __init__(self, db_path: str):
         self.db_path = db_path
         self.conn = None
+        self.team_stats_memo = TeamStatsMemo(HISTORY_DB_PATH)
+        self.totals_evaluator = TotalsEvaluator()
         # Inicializa colorama
         init()
 
     def connect(self):
-        """Conecta ao banco de dados"""
+        """Conecta ao banco de dados (somente leitura, conexão reaproveitada na thread)"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conn = get_read_only_connection(self.db_path)
             return True
         except sqlite3.Error as e:
             logger.error(f"Erro ao conectar ao banco de dados: {e}")
             return False
 
     def disconnect(self):
-        """Desconecta do banco de dados"""
-        if self.conn:
-            self.conn.close()
+        """Libera a conexão (ela continua aberta no pool da thread)"""
+        self.conn = None
 
     def get_market_odds(
         self, event_id: str, market_type: str = "Map 1 - Totals", odds_type: str = "map_1"
@@ -107,105 +183,55 @@ class ROIAnalyzer:
     def get_team_stats(self, team_name: str, stat_type: str, limit: int = 10) -> List[float]:
         """Busca estatísticas históricas reais de uma equipe - SEM FALLBACK"""
         try:
-            # ✅ CORRIGIDO: usar lol_history.db ao invés de lol_esports.db
-            history_conn = sqlite3.connect("data/lol_history.db")
-            cursor = history_conn.cursor()
-
-            # ✅ Buscar pelo nome do time na tabela teams
-            cursor.execute("SELECT team_id FROM teams WHERE name = ?", (team_name,))
-            team_result = cursor.fetchone()
-
-            if not team_result:
-                history_conn.close()
-                logger.warning(f"⚠️ Time '{team_name}' não encontrado no banco de dados")
-                return []
-
-            team_id = team_result[0]
-
-            # Buscar últimas partidas do time (últimos 60 dias)
-            query_matches = """
-            SELECT id FROM matches
-            WHERE (home_team_id = ? OR away_team_id = ?)
-            AND time_status = 3
-            AND event_time >= datetime('now', '-60 days')
-            ORDER BY event_time DESC
-            LIMIT 30
-            """
-
-            cursor.execute(query_matches, (team_id, team_id))
-            matches = cursor.fetchall()
-
-            if not matches:
-                history_conn.close()
-                logger.warning(f"⚠️ Nenhuma partida encontrada para '{team_name}' nos últimos 60 dias")
-                return []
-
-            # Buscar mapas dessas partidas
-            match_ids = [str(match[0]) for match in matches]
-            placeholders = ",".join(["?"] * len(match_ids))
-
-            query_maps = f"""
-            SELECT id FROM game_maps
-            WHERE match_id IN ({placeholders})
-            ORDER BY match_id DESC, map_number ASC
-            """
-
-            cursor.execute(query_maps, match_ids)
-            all_maps = cursor.fetchall()
-
-            if not all_maps:
-                history_conn.close()
-                logger.warning(f"⚠️ Nenhum mapa encontrado para '{team_name}'")
-                return []
-
-            # Buscar estatísticas dos mapas
-            map_ids = [str(map_data[0]) for map_data in all_maps]
-            placeholders = ",".join(["?"] * len(map_ids))
-
-            query_stats = f"""
-            SELECT home_value, away_value
-            FROM map_statistics
-            WHERE map_id IN ({placeholders})
-            AND stat_name = ?
-            ORDER BY map_id DESC
-            """
-
-            cursor.execute(query_stats, map_ids + [stat_type])
-            all_stats = cursor.fetchall()
-
-            # Processar estatísticas
-            valid_stats = []
-            for stat in all_stats:
-                if len(valid_stats) >= limit:
-                    break
-
-                home_value, away_value = stat
-                try:
-                    home_val = float(home_value) if home_value else 0.0
-                    away_val = float(away_value) if away_value else 0.0
-                    total_value = home_val + away_val
-
-                    # Para inhibitors, ignorar valores zerados
-                    if stat_type == "inhibitors" and total_value == 0:
-                        continue
-
-                    valid_stats.append(total_value)
-                except (ValueError, TypeError):
-                    continue
-
-            history_conn.close()
-
-            if len(valid_stats) == 0:
-                logger.warning(f"⚠️ Nenhuma estatística válida para '{team_name}' - {stat_type}")
-                return []
-
-            logger.info(f"✅ {len(valid_stats)} estatísticas reais encontradas para '{team_name}' - {stat_type}")
-            return valid_stats[:limit]
-
+            return self.team_stats_memo.get(team_name, stat_type, limit, self._load_team_stats)
         except Exception as e:
             logger.error(f"❌ Erro ao buscar stats para '{team_name}': {e}")
             return []
 
+    def get_all_team_stats(self, team_name: str, limit: int = 10) -> Dict[str, List[float]]:
+        """Históricos de todas as stats do time (uma consulta no máximo, via memo)"""
+        return {
+            stat_type: self.get_team_stats(team_name, stat_type, limit)
+            for stat_type in STAT_TYPES
+        }
+
+    def evaluate_lines(
+        self,
+        team1: str,
+        team2: str,
+        selections: List[str],
+        handicaps: List[float],
+        odds: List[float],
+    ) -> TotalsEvaluation:
+        """calculate_average_roi de todas as linhas do evento numa passada vetorizada"""
+        return self.totals_evaluator.evaluate(
+            selections,
+            handicaps,
+            odds,
+            self.get_all_team_stats(team1),
+            self.get_all_team_stats(team2),
+        )
+
+    def _load_team_stats(self, team_name: str, limit: int, cutoff: str) -> Dict[str, List[float]]:
+        """Todas as stats do time numa consulta: últimas 30 partidas desde `cutoff`"""
+        # ✅ CORRIGIDO: usar lol_history.db ao invés de lol_esports.db
+        history_conn = get_read_only_connection(HISTORY_DB_PATH)
+        totals = query_team_map_totals(
+            history_conn,
+            team_name,
+            STAT_TYPES,
+            limit,
+            match_limit=30,
+            since=cutoff,
+            require_score=False,
+        )
+
+        found = {stat_type: len(values) for stat_type, values in totals.items() if values}
+        if found:
+            logger.info(f"✅ Estatísticas reais encontradas para '{team_name}': {found}")
+        else:
+            logger.warning(f"⚠️ Nenhuma estatística válida para '{team_name}'")
+        return totals
 
     def calculate_roi(
         self,
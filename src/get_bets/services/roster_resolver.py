@@ -0,0 +1,70 @@
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.shared.config.team_names import TEAM_NAME_MAPPINGS
+
+
+class RosterResolver:
+    """
+    Elenco recente de cada time a partir do histórico de players (database.csv).
+
+    O elenco é quem jogou as últimas `games` partidas do time, com o nome do
+    time normalizado por TEAM_NAME_MAPPINGS dos dois lados (evento e CSV).
+    Devolve {player: teamname no CSV}, já pronto para o PlayerHistoryIndex.
+    Os elencos ficam em cache por time e por dia.
+    """
+
+    GAMES = 10
+
+    def __init__(self, df: pd.DataFrame, games: int = GAMES, mappings=TEAM_NAME_MAPPINGS):
+        self.games = games
+        self.mappings = mappings
+        self._df = df[df["playername"].notna() & df["teamname"].notna()]
+        # Sem gameid (DataFrame montado à mão), cada data conta como uma partida
+        self._game_column = "gameid" if "gameid" in self._df.columns else "date"
+
+        self._names_by_team: Dict[str, List[str]] = {}
+        for name in self._df["teamname"].astype(object).unique():
+            self._names_by_team.setdefault(self.canonical(name), []).append(name)
+
+        self._cache: Dict[Tuple[str, date], Dict[str, str]] = {}
+        self._cache_day: Optional[date] = None
+
+    def canonical(self, team_name: str) -> str:
+        return self.mappings.get(team_name, team_name)
+
+    def roster(self, team_name: Optional[str], day: Optional[date] = None) -> Dict[str, str]:
+        """{player: teamname no CSV} do elenco recente (vazio se o time não tem histórico)"""
+        if not team_name:
+            return {}
+        day = day or date.today()
+        if day != self._cache_day:
+            self._cache.clear()
+            self._cache_day = day
+
+        key = (self.canonical(team_name), day)
+        roster = self._cache.get(key)
+        if roster is None:
+            roster = self._cache[key] = self._build(key[0])
+        return roster
+
+    def _build(self, canonical_name: str) -> Dict[str, str]:
+        names = self._names_by_team.get(canonical_name)
+        if not names:
+            return {}
+
+        rows = self._df[self._df["teamname"].isin(names)]
+        last_played = (
+            rows.groupby(self._game_column, observed=True)["date"]
+            .max()
+            .sort_values(ascending=False, na_position="last")
+            .head(self.games)
+        )
+        recent = rows[rows[self._game_column].isin(last_played.index)]
+        recent = recent.sort_values("date", ascending=False, kind="stable")
+        recent = recent.drop_duplicates("playername")
+        return dict(
+            zip(recent["playername"].astype(object), recent["teamname"].astype(object))
+        )
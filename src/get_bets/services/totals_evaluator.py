@@ -0,0 +1,114 @@
+from typing import Dict, List, NamedTuple, Sequence
+
+import numpy as np
+
+from src.shared.core.history_queries import STAT_TYPES
+
+SIDE_OVER = 1
+SIDE_UNDER = -1
+NO_FAIR_ODDS = 999.99
+
+# Mesma precedência do ROIAnalyzer._get_stat_type
+STAT_KEYWORDS = (
+    ("dragon", "dragons"),
+    ("baron", "barons"),
+    ("kill", "kills"),
+    ("tower", "towers"),
+    ("inhibitor", "inhibitors"),
+)
+
+
+class TotalsEvaluation(NamedTuple):
+    """Resultado por linha (arrays alinhados com as linhas de entrada)"""
+
+    roi_team1: np.ndarray
+    roi_team2: np.ndarray
+    roi_average: np.ndarray
+    probability: np.ndarray
+    fair_odds: np.ndarray
+
+
+def selection_side(selection: str) -> int:
+    if "Over" in selection:
+        return SIDE_OVER
+    if "Under" in selection:
+        return SIDE_UNDER
+    return 0
+
+
+def stat_index(selection: str, stat_types: Sequence[str] = STAT_TYPES) -> int:
+    """Índice da stat da seleção em `stat_types` (len(stat_types) = desconhecida)"""
+    selection_lower = selection.lower()
+    for keyword, stat_type in STAT_KEYWORDS:
+        if keyword in selection_lower:
+            return stat_types.index(stat_type) if stat_type in stat_types else len(stat_types)
+    return len(stat_types)
+
+
+class TotalsEvaluator:
+    """
+    Avalia todas as linhas de totals de um evento de uma vez.
+
+    O histórico de cada time vira uma matriz (stat x jogos) preenchida com NaN;
+    cada linha seleciona a sua stat e compara com o handicap por broadcast.
+    NaN nunca é > nem < que o handicap, então o preenchimento não conta vitória.
+    Mesmas regras do ROIAnalyzer.calculate_average_roi: time sem histórico
+    tem ROI 0 e probabilidade 0; sem probabilidade a fair odds é 999.99.
+    """
+
+    def __init__(self, stat_types: Sequence[str] = STAT_TYPES):
+        self.stat_types = tuple(stat_types)
+
+    def history_matrix(self, team_stats: Dict[str, List[float]]):
+        """(valores, contagens) com uma linha extra vazia para stat desconhecida"""
+        width = max((len(v) for v in team_stats.values()), default=0)
+        values = np.full((len(self.stat_types) + 1, max(width, 1)), np.nan)
+        counts = np.zeros(len(self.stat_types) + 1)
+        for i, stat_type in enumerate(self.stat_types):
+            history = team_stats.get(stat_type) or []
+            values[i, : len(history)] = history
+            counts[i] = len(history)
+        return values, counts
+
+    def _team_wins(self, matrix, stats, sides, handicaps):
+        values, counts = matrix
+        rows = values[stats]
+        threshold = handicaps[:, None]
+        wins = np.where(
+            sides[:, None] == SIDE_OVER,
+            rows > threshold,
+            np.where(sides[:, None] == SIDE_UNDER, rows < threshold, False),
+        ).sum(axis=1)
+        return wins, counts[stats]
+
+    def evaluate(
+        self,
+        selections: Sequence[str],
+        handicaps: Sequence[float],
+        odds: Sequence[float],
+        team1_stats: Dict[str, List[float]],
+        team2_stats: Dict[str, List[float]],
+    ) -> TotalsEvaluation:
+        sides = np.array([selection_side(s) for s in selections], dtype=np.int8)
+        stats = np.array([stat_index(s, self.stat_types) for s in selections], dtype=np.intp)
+        handicaps = np.asarray(handicaps, dtype=float)
+        odds = np.asarray(odds, dtype=float)
+
+        rois, probabilities = [], []
+        for team_stats in (team1_stats, team2_stats):
+            wins, n = self._team_wins(self.history_matrix(team_stats), stats, sides, handicaps)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rois.append(np.where(n > 0, ((wins * odds) - n) / n * 100, 0.0))
+                probabilities.append(np.where(n > 0, wins / n, 0.0))
+
+        probability = (probabilities[0] + probabilities[1]) / 2
+        with np.errstate(divide="ignore"):
+            fair_odds = np.where(probability > 0, 1 / probability, NO_FAIR_ODDS)
+
+        return TotalsEvaluation(
+            roi_team1=rois[0],
+            roi_team2=rois[1],
+            roi_average=(rois[0] + rois[1]) / 2,
+            probability=probability,
+            fair_odds=fair_odds,
+        )
@@ -1,14 +1,21 @@
 # src/get_bets/strategies/strategies.py
 import logging
-import sqlite3
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 from scipy import stats
 
+from src.get_bets.services.player_history import PlayerHistoryIndex
+from src.get_bets.services.player_evaluator import PlayerMarketEvaluator
+from src.get_bets.services.player_matcher import PlayerNameMatcher
+from src.get_bets.services.roster_resolver import RosterResolver
+from src.get_bets.services.totals_evaluator import SIDE_OVER, SIDE_UNDER
+from src.shared.core.database import get_read_only_connection
+from src.shared.utils.csv_snapshot import CsvSnapshot
+
 logger = logging.getLogger("lol_bets")
 
 
@@ -120,6 +127,10 @@ class StatisticalStrategy(BettingStrategy):
         self.min_roi = min_roi
         self.odds_db_path = odds_db_path
         self.player_history_df = player_history_df
+        self.player_index: Optional[PlayerHistoryIndex] = None
+        self.player_matcher: Optional[PlayerNameMatcher] = None
+        self.roster_resolver: Optional[RosterResolver] = None
+        self.player_evaluator = PlayerMarketEvaluator()
 
         logger.info(f"🔧 Configurando estratégia com ROI mínimo: {min_roi}%")
         logger.info(f"📁 Caminho do banco de odds: {odds_db_path}")
@@ -201,8 +212,6 @@ class StatisticalStrategy(BettingStrategy):
                 return False
 
             logger.info(f"📖 Lendo CSV de players: {csv_path}")
-            df = pd.read_csv(csv_path, low_memory=False)
-
             needed_cols = [
                 "playername",
                 "teamname",
@@ -211,18 +220,20 @@ class StatisticalStrategy(BettingStrategy):
                 "deaths",
                 "assists",
             ]
+            # Snapshot colunar já tipado (refeito sozinho quando o CSV muda);
+            # gameid é opcional e só delimita as partidas dos elencos
+            df = CsvSnapshot(csv_path).load(needed_cols + ["gameid"])
+
             if not all(c in df.columns for c in needed_cols):
                 missing = [c for c in needed_cols if c not in df.columns]
                 logger.error(f"❌ CSV não contém colunas necessárias: {missing}")
                 logger.info(f"   Colunas disponíveis: {list(df.columns)}")
                 return False
 
-            logger.info("🔄 Convertendo tipos de dados...")
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-            for c in ["kills", "deaths", "assists"]:
-                df[c] = pd.to_numeric(df[c], errors="coerce")
-
             self.player_history_df = df
+            self.player_index = None
+            self.player_matcher = None
+            self.roster_resolver = None
             logger.info(f"✅ CSV carregado com sucesso: {len(df)} registros")
             logger.info(f"📊 Estatísticas do CSV:")
             logger.info(f"   Players únicos: {df['playername'].nunique()}")
@@ -245,27 +256,7 @@ class StatisticalStrategy(BettingStrategy):
             logger.debug(f"📭 Histórico de players vazio para {player}")
             return np.array([])
 
-        sub = self.player_history_df[self.player_history_df["playername"] == player]
-        logger.debug(f"🔍 Buscando {player} - encontrados {len(sub)} registros")
-
-        if team is not None:
-            sub_team = sub[sub["teamname"] == team]
-            logger.debug(f"   No time {team}: {len(sub_team)} registros")
-        else:
-            sub_team = pd.DataFrame(columns=sub.columns)
-
-        if sub_team.empty:
-            if not sub.empty:
-                counts = sub.groupby("teamname").size().sort_values(ascending=False)
-                if len(counts) > 0:
-                    fallback = counts.index[0]
-                    logger.debug(f"   Usando fallback: {fallback}")
-                    sub_team = sub[sub["teamname"] == fallback]
-                else:
-                    sub_team = sub
-
-        sub_team = sub_team.dropna(subset=[stat]).sort_values("date", ascending=False)
-        values = sub_team[stat].astype(float).values[:n]
+        values = self._get_player_index().values(player, team, stat, n)
 
         logger.debug(f"   Valores de {stat} para {player}: {len(values)} registros")
         if len(values) > 0:
@@ -275,6 +266,68 @@ class StatisticalStrategy(BettingStrategy):
 
         return values
 
+    def _get_player_index(self) -> PlayerHistoryIndex:
+        """Índice (player, time) -> valores por data, montado uma vez por histórico"""
+        if self.player_index is None:
+            logger.info("🗂️ Indexando histórico de players...")
+            self.player_index = PlayerHistoryIndex(self.player_history_df)
+            logger.info(f"✅ {len(self.player_index)} pares (player, time) indexados")
+        return self.player_index
+
+    def _get_player_matcher(self) -> PlayerNameMatcher:
+        """Matcher de nomes sobre todos os players do histórico, montado uma vez"""
+        if self.player_matcher is None:
+            self.player_matcher = PlayerNameMatcher(self._get_player_index().players)
+        return self.player_matcher
+
+    def _get_roster_resolver(self) -> RosterResolver:
+        """Elencos recentes por time, montados a partir do histórico carregado"""
+        if self.roster_resolver is None:
+            self.roster_resolver = RosterResolver(self.player_history_df)
+        return self.roster_resolver
+
+    def _event_player_matcher(
+        self, home_team: Optional[str], away_team: Optional[str]
+    ) -> Tuple[Callable[[str], Optional[str]], Dict[str, str]]:
+        """
+        (função selection -> player, elenco {player: time no CSV}) do evento.
+
+        Cada time com elenco recente casa só contra ele; para o time sem elenco
+        (nome fora do TEAM_NAME_MAPPINGS, time novo) valem todos os players do
+        histórico. A seleção não diz de qual time é, então com um só elenco
+        conhecido tenta o nome inteiro nesse elenco e depois o histórico todo.
+        """
+        resolver = self._get_roster_resolver()
+        home_roster = resolver.roster(home_team)
+        away_roster = resolver.roster(away_team)
+        # O da casa prevalece se um player aparecer nos dois
+        roster = {**away_roster, **home_roster}
+
+        unresolved = [
+            team for team, team_roster in ((home_team, home_roster), (away_team, away_roster))
+            if not team_roster
+        ]
+        matcher = self._get_player_matcher()
+        for team in unresolved:
+            logger.warning(
+                f"⚠️ Elenco não encontrado para {team or 'time desconhecido'}, "
+                f"usando os {len(matcher)} players do histórico"
+            )
+        if not roster:
+            return matcher.match, roster
+
+        roster_matcher = matcher.restrict(roster)
+        logger.info(f"👥 {len(roster_matcher)} players nos elencos do evento")
+        if not unresolved:
+            return roster_matcher.match, roster
+
+        def match_player(selection_name) -> Optional[str]:
+            return roster_matcher.match(selection_name, substring=False) or matcher.match(
+                selection_name
+            )
+
+        return match_player, roster
+
     def _analyze_player_markets(self, event_data: Dict, stake: float) -> List[Dict]:
         """Analisa odds de players usando a estrutura real do banco"""
         good_bets: List[Dict] = []
@@ -297,7 +350,7 @@ class StatisticalStrategy(BettingStrategy):
         try:
             if self.odds_db_path:
                 odds_db_path = Path(self.odds_db_path)
-                conn = sqlite3.connect(str(odds_db_path))
+                conn = get_read_only_connection(odds_db_path)
                 cursor = conn.cursor()
 
                 # Buscar informações do evento na tabela events
@@ -321,8 +374,6 @@ class StatisticalStrategy(BettingStrategy):
                     logger.warning(
                         f"⚠️ Evento {event_id} não encontrado na tabela events"
                     )
-
-                conn.close()
         except Exception as e:
             logger.error(f"❌ Erro ao buscar informações do evento: {e}")
 
@@ -339,7 +390,7 @@ class StatisticalStrategy(BettingStrategy):
                 logger.error(f"❌ Banco de odds não encontrado: {odds_db_path}")
                 return good_bets
 
-            conn = sqlite3.connect(str(odds_db_path))
+            conn = get_read_only_connection(odds_db_path)
 
             # ✅ Query corrigida com os nomes REAIS das colunas
             q = """
@@ -355,7 +406,6 @@ class StatisticalStrategy(BettingStrategy):
             """
             logger.info(f"🔍 Buscando odds de players para evento {event_id}")
             odds_df = pd.read_sql_query(q, conn, params=[event_id])
-            conn.close()
 
             logger.info(f"📈 Encontradas {len(odds_df)} odds de players brutas")
 
@@ -379,12 +429,8 @@ class StatisticalStrategy(BettingStrategy):
             odds_df["side"] = odds_df["selection"].apply(self._extract_side)
             odds_df["stat"] = odds_df["market_type"].map(stat_map)
 
-            candidates = self.player_history_df["playername"].dropna().unique().tolist()
-            logger.info(f"👥 {len(candidates)} players únicos no histórico")
-
-            odds_df["player"] = odds_df["selection"].apply(
-                lambda s: self._extract_player(s, candidates)
-            )
+            match_player, roster = self._event_player_matcher(home_team, away_team)
+            odds_df["player"] = odds_df["selection"].map(match_player)
 
             # Filtrar válidas
             dfv = odds_df[
@@ -400,79 +446,62 @@ class StatisticalStrategy(BettingStrategy):
             if dfv.empty:
                 return good_bets
 
-            # Processar cada aposta de player
-            logger.info("🧮 Calculando ROI para cada aposta...")
-            for i, (_, row) in enumerate(dfv.iterrows()):
-                player = row["player"]
-                stat = row["stat"]
-                side = row["side"]
-                line = float(row["handicap"])
-                odds = float(row["odds_value"])
-                market_name = row["market_type"]
-                selection_line = row["selection"]
-
-                logger.debug(
-                    f"   [{i+1}/{len(dfv)}] Analisando {player} - {stat} {side} {line} @ {odds}"
-                )
-
-                # Escolher time heurístico
-                v_home = self._get_player_values(player, home_team, stat, n=1)
-                v_away = self._get_player_values(player, away_team, stat, n=1)
-                team_guess = home_team if len(v_home) >= len(v_away) else away_team
-                logger.debug(f"      Time escolhido: {team_guess}")
-
-                values = self._get_player_values(player, team_guess, stat, n=50)
+            # Histórico de cada seleção (time pelo elenco; fora dele, heurística)
+            index = self._get_player_index()
+            rows, histories = [], []
+            for row in dfv.itertuples(index=False):
+                team_guess = roster.get(row.player)
+                if team_guess is None:
+                    v_home = self._get_player_values(row.player, home_team, row.stat, n=1)
+                    v_away = self._get_player_values(row.player, away_team, row.stat, n=1)
+                    team_guess = home_team if len(v_home) >= len(v_away) else away_team
+
+                values = index.values(row.player, team_guess, row.stat, n=50)
                 if len(values) < 20:
-                    logger.debug(f"      ❌ Dados insuficientes: {len(values)} < 20")
+                    logger.debug(
+                        f"   ❌ {row.player} - {row.stat}: dados insuficientes ({len(values)} < 20)"
+                    )
                     continue
+                rows.append(row)
+                histories.append(values)
 
-                logger.debug(f"      ✅ Dados suficientes: {len(values)} registros")
-
-                l10 = values[:10]
-                l20 = values[:20]
-                st10 = self._calc_window_stats(l10, line, side)
-                st20 = self._calc_window_stats(l20, line, side)
-
-                if st10 is None or st20 is None:
-                    logger.debug("      ❌ Não foi possível calcular estatísticas")
-                    continue
+            if not rows:
+                return good_bets
 
-                # MÉTODO ORIGINAL:
-                p_prior = self._implied_prob(odds)
-                p_like = 0.6 * st10["hit_rate"] + 0.4 * st20["hit_rate"]
-                p_real = self._posterior(p_prior, p_like, w_prior=0.5)
-                fair = self._fair_from_p(p_real)
-                roi = (odds / fair - 1.0) * 100.0
-                ev_pct = self._ev_percent(p_real, odds)
+            # Todas as seleções do evento numa passada só
+            logger.info(f"🧮 Calculando ROI para {len(rows)} apostas...")
+            ev = self.player_evaluator.evaluate(
+                histories,
+                [SIDE_OVER if row.side == "over" else SIDE_UNDER for row in rows],
+                [row.handicap for row in rows],
+                [row.odds_value for row in rows],
+            )
 
+            for i, row in enumerate(rows):
+                roi = float(ev.roi[i])
                 logger.debug(
-                    f"      📊 Estatísticas: HR10={st10['hit_rate']:.3f}, HR20={st20['hit_rate']:.3f}"
-                )
-                logger.debug(
-                    f"      🎯 Probabilidades: prior={p_prior:.3f}, like={p_like:.3f}, real={p_real:.3f}"
+                    f"   {row.player} - {row.stat} {row.side} {row.handicap} @ {row.odds_value}: "
+                    f"HR10={ev.hit_rate_10[i]:.3f}, HR20={ev.hit_rate_20[i]:.3f}, "
+                    f"real={ev.p_real[i]:.3f}, ROI {roi:.1f}%"
                 )
-                logger.debug(f"      💰 ROI: {roi:.1f}% (mínimo: {self.min_roi}%)")
-
-                if roi >= self.min_roi and p_real > p_prior:
+                if roi >= self.min_roi and ev.p_real[i] > ev.p_prior[i]:
                     logger.info(
-                        f"      ✅ APOSTA ENCONTRADA: {player} - ROI {roi:.1f}%"
+                        f"      ✅ APOSTA ENCONTRADA: {row.player} - ROI {roi:.1f}%"
                     )
                     good_bets.append(
                         {
                             "event_id": event_id,
-                            "market_name": market_name,
-                            "selection_line": selection_line,
-                            "handicap": line,
-                            "house_odds": odds,
+                            "market_name": row.market_type,
+                            "selection_line": row.selection,
+                            "handicap": float(row.handicap),
+                            "house_odds": float(row.odds_value),
                             "roi_average": roi,
-                            "fair_odds": fair,
+                            "fair_odds": float(ev.fair_odds[i]),
                             "actual_value": None,
                             "odds_type": "player",  # ✅ ADICIONAR
                             "map_number": 1,  # ✅ ADICIONAR
                         }
                     )
-                else:
-                    logger.debug(f"      ❌ ROI insuficiente ou probabilidade baixa")
 
         except Exception as e:
             logger.error(f"❌ Erro ao analisar players: {e}")
@@ -496,7 +525,7 @@ class StatisticalStrategy(BettingStrategy):
             return all_good_bets
 
         try:
-            conn = sqlite3.connect(str(self.odds_db_path))
+            conn = get_read_only_connection(self.odds_db_path)
 
             query = """
                 SELECT market_type, selection, line, odds, map_number, odds_type
@@ -510,7 +539,6 @@ class StatisticalStrategy(BettingStrategy):
             cursor = conn.cursor()
             cursor.execute(query, (event_id,))
             rows = cursor.fetchall()
-            conn.close()
 
             logger.info(f"📊 Encontradas {len(rows)} linhas de totals no banco")
 
@@ -536,7 +564,8 @@ class StatisticalStrategy(BettingStrategy):
                 logger.error(f"❌ Erro ao buscar info dos times: {e}")
                 return all_good_bets
 
-            # Processar cada linha
+            # Linhas com handicap numérico
+            lines = []
             for row in rows:
                 market_type, selection, line_str, odds, map_number, odds_type = row
 
@@ -548,49 +577,48 @@ class StatisticalStrategy(BettingStrategy):
                     )
                     continue
 
-                odds_value = float(odds)
+                lines.append((market_type, selection, handicap, float(odds), map_number, odds_type))
 
-                logger.debug(
-                    f"   Processando: {market_type} - {selection} {handicap} @ {odds_value}"
-                )
+            if not lines:
+                return all_good_bets
 
-                # ✅ APENAS ROIAnalyzer com dados reais
-                try:
-                    roi_team1, roi_team2, roi_average, fair_odds_average = (
-                        self.roi_analyzer.calculate_average_roi(
-                            team1, team2, selection, handicap, odds_value
-                        )
-                    )
+            # ✅ APENAS ROIAnalyzer com dados reais - todas as linhas de uma vez
+            results = self._evaluate_total_lines(team1, team2, lines)
 
-                    logger.debug(f"      ROI: {roi_average:.1f}%")
+            for (market_type, selection, handicap, odds_value, map_number, odds_type), result in zip(
+                lines, results
+            ):
+                if result is None:
+                    continue
+                roi_average, fair_odds_average = result
 
-                    if roi_average > self.min_roi:
-                        logger.info(
-                            f"      ✅ APOSTA TOTAL: {market_type} - {selection} {handicap} - ROI {roi_average:.1f}%"
-                        )
-                        bet_data = {
-                            "event_id": event_id,
-                            "market_name": market_type,
-                            "selection_line": selection,
-                            "handicap": handicap,
-                            "house_odds": odds_value,
-                            "roi_average": roi_average,
-                            "fair_odds": fair_odds_average,
-                            "actual_value": None,
-                            "odds_type": odds_type,
-                            "map_number": (
-                                map_number
-                                if map_number
-                                else (1 if "Map 1" in market_type else 2)
-                            ),
-                        }
-                        all_good_bets.append(bet_data)
-                    else:
-                        logger.debug(f"      ❌ ROI insuficiente: {roi_average:.1f}%")
+                logger.debug(
+                    f"   {market_type} - {selection} {handicap} @ {odds_value}: ROI {roi_average:.1f}%"
+                )
 
-                except Exception as e:
-                    logger.debug(f"      ❌ Erro ao calcular ROI: {e}")
-                    continue
+                if roi_average > self.min_roi:
+                    logger.info(
+                        f"      ✅ APOSTA TOTAL: {market_type} - {selection} {handicap} - ROI {roi_average:.1f}%"
+                    )
+                    bet_data = {
+                        "event_id": event_id,
+                        "market_name": market_type,
+                        "selection_line": selection,
+                        "handicap": handicap,
+                        "house_odds": odds_value,
+                        "roi_average": roi_average,
+                        "fair_odds": fair_odds_average,
+                        "actual_value": None,
+                        "odds_type": odds_type,
+                        "map_number": (
+                            map_number
+                            if map_number
+                            else (1 if "Map 1" in market_type else 2)
+                        ),
+                    }
+                    all_good_bets.append(bet_data)
+                else:
+                    logger.debug(f"      ❌ ROI insuficiente: {roi_average:.1f}%")
 
             # Ordenar por ROI
             all_good_bets.sort(key=lambda x: x["roi_average"], reverse=True)
@@ -601,6 +629,42 @@ class StatisticalStrategy(BettingStrategy):
         logger.info(f"🎯 Total de apostas de totals válidas: {len(all_good_bets)}")
         return all_good_bets
 
+    def _evaluate_total_lines(
+        self, team1: str, team2: str, lines: List[Tuple]
+    ) -> List[Optional[Tuple[float, float]]]:
+        """
+        (roi_average, fair_odds) de cada linha numa passada vetorizada. Se a
+        passada falhar, avalia linha a linha e só as que falharem ficam None.
+        """
+        try:
+            evaluation = self.roi_analyzer.evaluate_lines(
+                team1,
+                team2,
+                [line[1] for line in lines],
+                [line[2] for line in lines],
+                [line[3] for line in lines],
+            )
+            return list(zip(evaluation.roi_average.tolist(), evaluation.fair_odds.tolist()))
+        except Exception as e:
+            logger.error(f"❌ Erro ao calcular ROI das linhas de totals: {e}", exc_info=True)
+
+        results = []
+        for market_type, selection, handicap, odds_value, _, _ in lines:
+            try:
+                evaluation = self.roi_analyzer.evaluate_lines(
+                    team1, team2, [selection], [handicap], [odds_value]
+                )
+                results.append(
+                    (float(evaluation.roi_average[0]), float(evaluation.fair_odds[0]))
+                )
+            except Exception as e:
+                logger.error(
+                    f"❌ Erro ao calcular ROI de {market_type} - {selection}: {e}",
+                    exc_info=True,
+                )
+                results.append(None)
+        return results
+
 
 class BasicStrategy(BettingStrategy):
     """Estratégia básica alternativa (para demonstração)"""
@@ -2,12 +2,57 @@ import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from src.shared.core.history_queries import STAT_TYPES, team_map_totals_query
+from src.shared.services.team_registry import TeamRegistry
+
 
 class HistoryDatabase:
+    # Índices das consultas de get_bets (StatsCalculator/ROIAnalyzer) e get_results
+    # (HistoryRepository); (nome, tabela e colunas)
+    INDEXES = (
+        ("idx_teams_name", "teams (name, team_id)"),
+        ("idx_matches_home", "matches (home_team_id, time_status, event_time)"),
+        ("idx_matches_away", "matches (away_team_id, time_status, event_time)"),
+        ("idx_matches_event_time", "matches (event_time)"),
+        ("idx_game_maps_match", "game_maps (match_id, map_number)"),
+        (
+            "idx_map_statistics_map",
+            "map_statistics (map_id, stat_name, home_value, away_value)",
+        ),
+    )
+
+    # Consultas que não podem cair em full scan (scripts/check_query_plans.py)
+    HOT_QUERIES = {
+        "team_by_name": ("SELECT team_id FROM teams WHERE name = ?", ("T1",)),
+        # StatsCalculator.get_all_team_stats e ROIAnalyzer._load_team_stats
+        "team_map_totals": team_map_totals_query("T1", STAT_TYPES, 20, 60),
+        "team_map_totals_since": team_map_totals_query(
+            "T1", STAT_TYPES, 10, 30, since="2025-01-01 00:00:00", require_score=False
+        ),
+        "match_by_bet365_id": ("SELECT * FROM matches WHERE bet365_id = ?", ("1",)),
+        "incomplete_matches": (
+            """
+            SELECT * FROM matches
+            WHERE (time_status != 3 OR final_score IS NULL) AND event_time >= ?
+            ORDER BY event_time DESC
+            """,
+            ("2025-01-01",),
+        ),
+        "map_of_match": (
+            "SELECT id FROM game_maps WHERE match_id = ? AND map_number = ?",
+            (1, 1),
+        ),
+        "stats_of_map": (
+            "SELECT stat_name, home_value, away_value FROM map_statistics WHERE map_id = ?",
+            (1,),
+        ),
+    }
+
     def __init__(self, db_path: str = "data/lol_history.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._init_tables()
+        self.teams = TeamRegistry.for_database(self.db_path)
 
     def _init_tables(self):
         with sqlite3.connect(self.db_path) as conn:
@@ -75,6 +120,28 @@ class HistoryDatabase:
                 )
             """
             )
+            self._ensure_indexes(conn)
+
+    def _ensure_indexes(self, conn):
+        """Cria os índices das consultas quentes que faltam e atualiza as estatísticas do planner"""
+        existing = {
+            row[0]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        missing = [(name, ddl) for name, ddl in self.INDEXES if name not in existing]
+        for name, ddl in missing:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {ddl}")
+        if missing:
+            conn.execute("ANALYZE")
+
+    def explain_hot_queries(self) -> dict[str, list[str]]:
+        """Plano (EXPLAIN QUERY PLAN) de cada consulta quente, por nome"""
+        plans = {}
+        with sqlite3.connect(self.db_path) as conn:
+            for name, (query, params) in self.HOT_QUERIES.items():
+                rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+                plans[name] = [row[-1] for row in rows]
+        return plans
 
     def insert_league(self, league_id: str, name: str):
         with sqlite3.connect(self.db_path) as conn:
@@ -84,20 +151,29 @@ class HistoryDatabase:
             )
 
     def insert_team(self, team_data: dict):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                INSERT OR IGNORE INTO teams (team_id, name, image_id, country_code, created_at)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    team_data["team_id"],
-                    team_data["name"],
-                    team_data.get("image_id"),
-                    team_data.get("country_code"),
-                    datetime.now().isoformat(),
-                ),
-            )
+        self.insert_teams([team_data])
+
+    def insert_teams(self, teams: list[dict]):
+        """Insere os times ainda desconhecidos; os já vistos são resolvidos em memória"""
+        now = datetime.now().isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                self.teams.resolve_many(
+                    conn,
+                    (
+                        {
+                            "team_id": team_data["team_id"],
+                            "name": team_data["name"],
+                            "image_id": team_data.get("image_id"),
+                            "country_code": team_data.get("country_code"),
+                            "created_at": now,
+                        }
+                        for team_data in teams
+                    ),
+                )
+        except Exception:
+            self.teams.invalidate()
+            raise
 
     def get_match(self, bet365_id: str) -> dict | None:
         with sqlite3.connect(self.db_path) as conn:
@@ -3,6 +3,8 @@ from datetime import datetime
 
 from src.get_history.database import HistoryDatabase
 from src.get_history.services.match_service import MatchService
+from src.shared.config.settings import settings
+from src.shared.core.async_db import DatabaseExecutor, LoopLagMonitor
 from src.shared.core.bet365_client import Bet365Client
 from src.shared.services.rate_limiter import RateLimiter
 
@@ -10,15 +12,25 @@ logger = logging.getLogger("lol_history")
 
 
 class HistoryOrchestrator:
-    def __init__(self):
-        self.db = HistoryDatabase()
-        self.client = Bet365Client()
-        self.rate_limiter = RateLimiter(max_requests=3500, time_window=3600)
-        self.match_service = MatchService(self.db, self.client, self.rate_limiter)
+    def __init__(self, db=None, client=None, rate_limiter=None):
+        self.db = db or HistoryDatabase()
+        self.rate_limiter = rate_limiter or RateLimiter(
+            max_requests=3500,
+            time_window=3600,
+            burst=settings.RATE_LIMIT_BURST or None,
+            shared_path=settings.RATE_LIMIT_SHARED_PATH or None,
+        )
+        self.client = client or Bet365Client(rate_limiter=self.rate_limiter)
+        self.db_executor = DatabaseExecutor.for_database(self.db.db_path)
+        self.loop_monitor = LoopLagMonitor()
+        self.match_service = MatchService(
+            self.db, self.client, self.rate_limiter, db_executor=self.db_executor
+        )
 
     async def run(self, days_back: int = 2):
         start_time = datetime.now()
         logger.info(f"🚀 Iniciando atualização - últimos {days_back} dias")
+        self.loop_monitor.start()
 
         try:
             stats = await self.match_service.fetch_and_process_matches(days_back)
@@ -36,4 +48,8 @@ class HistoryOrchestrator:
             logger.error(f"❌ Erro: {e}", exc_info=True)
             raise
         finally:
+            await self.loop_monitor.stop()
+            logger.info(f"⏱️  {self.loop_monitor.report()}")
+            for line in self.client.latency_report():
+                logger.info(f"⏱️  {line}")
             await self.client.close()
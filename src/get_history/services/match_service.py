@@ -2,6 +2,7 @@ import logging
 from datetime import datetime, timedelta
 
 from src.get_history.database import HistoryDatabase
+from src.shared.core.async_db import AsyncRepository, DatabaseExecutor
 from src.shared.core.bet365_client import Bet365Client
 from src.shared.services.rate_limiter import RateLimiter
 from src.shared.utils.validators import is_lol_event
@@ -11,9 +12,16 @@ logger = logging.getLogger("lol_history")
 
 class MatchService:
     def __init__(
-        self, db: HistoryDatabase, client: Bet365Client, rate_limiter: RateLimiter
+        self,
+        db: HistoryDatabase,
+        client: Bet365Client,
+        rate_limiter: RateLimiter,
+        db_executor: DatabaseExecutor = None,
     ):
         self.db = db
+        # Acesso ao SQLite fora do event loop, numa thread dedicada ao banco
+        self.db_executor = db_executor or DatabaseExecutor.for_database(db.db_path)
+        self.repo = AsyncRepository(db, self.db_executor)
         self.client = client
         self.rate_limiter = rate_limiter
         self.lol_sport_id = 151
@@ -24,7 +32,7 @@ class MatchService:
         logger.info(f"📥 {len(api_matches)} partidas da API")
 
         # 2. Buscar partidas incompletas no banco
-        incomplete_matches = self.db.get_incomplete_matches(days_back)
+        incomplete_matches = await self.repo.get_incomplete_matches(days_back)
         logger.info(f"🔄 {len(incomplete_matches)} partidas incompletas no banco")
 
         # 3. Processar partidas da API
@@ -50,7 +58,6 @@ class MatchService:
             day_str = target_date.strftime("%Y%m%d")
 
             try:
-                await self.rate_limiter.acquire()
                 daily_events = await self.client.upcoming(
                     sport_id=self.lol_sport_id, day=day_str
                 )
@@ -77,7 +84,7 @@ class MatchService:
             bet365_id = event.get("id")
 
             try:
-                existing = self.db.get_match(bet365_id)
+                existing = await self.repo.get_match(bet365_id)
 
                 if existing and existing.get("time_status") == 3:
                     stats["skipped"] += 1
@@ -93,7 +100,9 @@ class MatchService:
                     stats["skipped"] += 1
                     continue
 
-                status = self._save_or_update_match(event, result, existing)
+                status = await self.db_executor.run(
+                    self._save_or_update_match, event, result, existing
+                )
                 stats[status] += 1
 
             except Exception as e:
@@ -139,11 +148,11 @@ class MatchService:
                     "final_score": result.get("ss", match.get("final_score")),
                 }
 
-                self.db.update_match(bet365_id, match_data)
+                await self.repo.update_match(bet365_id, match_data)
 
                 # Se finalizou, salvar estatísticas dos mapas
                 if match_data["time_status"] == 3 and match_data["final_score"]:
-                    self._save_map_stats(match["id"], result)
+                    await self.db_executor.run(self._save_map_stats, match["id"], result)
                     logger.info(f"✅ {bet365_id} finalizada e atualizada")
                 else:
                     logger.info(f"🔄 {bet365_id} atualizada (ainda não finalizada)")
@@ -157,7 +166,6 @@ class MatchService:
         return stats
 
     async def _fetch_match_result(self, bet365_id: str) -> dict | None:
-        await self.rate_limiter.acquire()
         result_data = await self.client.result(bet365_id)
 
         if not result_data or result_data.get("success") != 1:
@@ -190,27 +198,18 @@ class MatchService:
         if league.get("id") and league.get("name"):
             self.db.insert_league(str(league["id"]), league["name"])
 
-        home_team = event.get("home", {})
-        if home_team.get("id"):
-            self.db.insert_team(
-                {
-                    "team_id": str(home_team["id"]),
-                    "name": home_team.get("name", "Unknown"),
-                    "image_id": home_team.get("image_id"),
-                    "country_code": home_team.get("cc"),
-                }
-            )
-
-        away_team = event.get("away", {})
-        if away_team.get("id"):
-            self.db.insert_team(
-                {
-                    "team_id": str(away_team["id"]),
-                    "name": away_team.get("name", "Unknown"),
-                    "image_id": away_team.get("image_id"),
-                    "country_code": away_team.get("cc"),
-                }
-            )
+        teams = [
+            {
+                "team_id": str(team["id"]),
+                "name": team.get("name", "Unknown"),
+                "image_id": team.get("image_id"),
+                "country_code": team.get("cc"),
+            }
+            for team in (event.get("home", {}), event.get("away", {}))
+            if team.get("id")
+        ]
+        if teams:
+            self.db.insert_teams(teams)
 
     def _extract_match_data(self, event: dict, result: dict) -> dict:
         home_team = event.get("home", {})
@@ -4,8 +4,8 @@ from src.shared.core.database import BaseDatabase
 class OddsDatabase(BaseDatabase):
     """Banco de dados específico para odds"""
 
-    def __init__(self):
-        super().__init__("lol_odds.db")
+    def __init__(self, data_dir=None):
+        super().__init__("lol_odds.db", data_dir)
         self._init_schema()
 
     def _init_schema(self):
@@ -40,6 +40,7 @@ class OddsDatabase(BaseDatabase):
                     match_date TEXT,
                     match_timestamp INTEGER,
                     status TEXT DEFAULT 'upcoming',
+                    odds_checked_at TEXT,
                     created_at TEXT DEFAULT (datetime('now')),
                     updated_at TEXT DEFAULT (datetime('now')),
                     FOREIGN KEY (home_team_id) REFERENCES teams (id),
@@ -53,6 +54,16 @@ class OddsDatabase(BaseDatabase):
                 conn.execute("ALTER TABLE events ADD COLUMN FI TEXT")
             if "bet365_key" not in columns and columns:
                 conn.execute("ALTER TABLE events ADD COLUMN bet365_key TEXT")
+            if "odds_checked_at" not in columns and columns:
+                conn.execute("ALTER TABLE events ADD COLUMN odds_checked_at TEXT")
+                conn.execute(
+                    """
+                    UPDATE events SET odds_checked_at = (
+                        SELECT MAX(co.updated_at) FROM current_odds co
+                        WHERE co.event_id = events.event_id
+                    )
+                """
+                )
 
             conn.execute(
                 """
@@ -72,6 +83,34 @@ class OddsDatabase(BaseDatabase):
             """
             )
 
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS event_raw_odds (
+                    event_id TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    updated_at TEXT DEFAULT (datetime('now')),
+                    FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
+                )
+            """
+            )
+
+            # Agenda adaptativa de coleta de odds (RefreshScheduler)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS odds_schedule (
+                    event_id TEXT PRIMARY KEY,
+                    next_due_at INTEGER NOT NULL,
+                    interval_seconds INTEGER NOT NULL,
+                    volatility REAL,
+                    last_checked_at INTEGER,
+                    FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
+                )
+            """
+            )
+
+            self._ensure_odds_natural_key(conn)
+            self._init_odds_history(conn)
+
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_teams_team_id ON teams (team_id)"
             )
@@ -82,6 +121,9 @@ class OddsDatabase(BaseDatabase):
                 "CREATE INDEX IF NOT EXISTS idx_events_status ON events (status)"
             )
             conn.execute("CREATE INDEX IF NOT EXISTS idx_events_FI ON events (FI)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_odds_schedule_due ON odds_schedule (next_due_at)"
+            )
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_current_odds_event ON current_odds (event_id)"
             )
@@ -94,3 +136,85 @@ class OddsDatabase(BaseDatabase):
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_current_odds_updated ON current_odds (updated_at)"
             )
+
+    def _ensure_odds_natural_key(self, conn):
+        """Cria a chave natural única de current_odds, removendo duplicatas antigas"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_current_odds_natural_key'"
+        ).fetchone()
+        if exists:
+            return
+
+        conn.execute("UPDATE current_odds SET line = '' WHERE line IS NULL")
+        conn.execute(
+            """
+            DELETE FROM current_odds
+            WHERE id NOT IN (
+                SELECT MAX(id) FROM current_odds
+                GROUP BY event_id, odds_type, market_type, selection, line
+            )
+        """
+        )
+        conn.execute(
+            """
+            CREATE UNIQUE INDEX idx_current_odds_natural_key
+            ON current_odds (event_id, odds_type, market_type, selection, line)
+        """
+        )
+
+    def _init_odds_history(self, conn):
+        """Tabelas append-only de movimentação de odds (dicionário de mercados + preços)"""
+        history_exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'odds_history'"
+        ).fetchone()
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS odds_markets (
+                id INTEGER PRIMARY KEY,
+                odds_type TEXT NOT NULL,
+                market_type TEXT NOT NULL,
+                selection TEXT NOT NULL,
+                UNIQUE (odds_type, market_type, selection)
+            )
+        """
+        )
+
+        # odds_milli = odds * 1000 (0 = linha retirada); recorded_at em unix timestamp
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS odds_history (
+                event_id TEXT NOT NULL,
+                market_id INTEGER NOT NULL,
+                line TEXT NOT NULL,
+                recorded_at INTEGER NOT NULL,
+                odds_milli INTEGER NOT NULL,
+                PRIMARY KEY (event_id, market_id, line, recorded_at)
+            ) WITHOUT ROWID
+        """
+        )
+
+        if history_exists:
+            return
+
+        # Primeira execução: semear com as odds atuais como preço de abertura
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO odds_markets (odds_type, market_type, selection)
+            SELECT DISTINCT odds_type, market_type, selection FROM current_odds
+        """
+        )
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO odds_history
+                (event_id, market_id, line, recorded_at, odds_milli)
+            SELECT co.event_id, m.id, COALESCE(co.line, ''),
+                   CAST(strftime('%s', COALESCE(co.updated_at, 'now')) AS INTEGER),
+                   CAST(ROUND(co.odds * 1000) AS INTEGER)
+            FROM current_odds co
+            JOIN odds_markets m
+              ON m.odds_type = co.odds_type
+             AND m.market_type = co.market_type
+             AND m.selection = co.selection
+        """
+        )
@@ -5,7 +5,11 @@ from pathlib import Path
 from src.get_odds.database import OddsDatabase
 from src.get_odds.services.dashboard_service import DashboardService
 from src.get_odds.services.event_service import EventService
+from src.get_odds.services.odds_history_service import OddsHistoryService
 from src.get_odds.services.odds_service import OddsService
+from src.get_odds.services.refresh_scheduler import RefreshScheduler
+from src.shared.config.settings import settings
+from src.shared.core.async_db import DatabaseExecutor, LoopLagMonitor
 from src.shared.core.bet365_client import Bet365Client
 from src.shared.services.rate_limiter import RateLimiter
 
@@ -13,13 +17,34 @@ logger = logging.getLogger("lol_odds")
 
 
 class OddsOrchestrator:
-    def __init__(self):
-        self.db = OddsDatabase()
-        self.client = Bet365Client()
-        self.rate_limiter = RateLimiter(max_requests=3500, time_window=3600)
+    def __init__(self, db=None, client=None, rate_limiter=None):
+        self.db = db or OddsDatabase()
+        self.rate_limiter = rate_limiter or RateLimiter(
+            max_requests=3500,
+            time_window=3600,
+            burst=settings.RATE_LIMIT_BURST or None,
+            shared_path=settings.RATE_LIMIT_SHARED_PATH or None,
+        )
+        self.client = client or Bet365Client(rate_limiter=self.rate_limiter)
+        self.db_executor = DatabaseExecutor.for_database(self.db.db_path)
+        self.loop_monitor = LoopLagMonitor()
 
         self.event_service = EventService(self.db, self.client, self.rate_limiter)
-        self.odds_service = OddsService(self.db, self.client, self.rate_limiter)
+        self.history_service = OddsHistoryService(self.db)
+        self.refresh_scheduler = RefreshScheduler(
+            self.db,
+            self.rate_limiter,
+            reserve=settings.ODDS_REFRESH_RESERVE,
+            max_per_run=settings.ODDS_REFRESH_MAX_PER_RUN or None,
+        )
+        self.odds_service = OddsService(
+            self.db,
+            self.client,
+            self.rate_limiter,
+            history=self.history_service,
+            scheduler=self.refresh_scheduler,
+            db_executor=self.db_executor,
+        )
         self.dashboard_service = DashboardService(self.db)
 
         logger.info(f"📀 Database inicializado: {self.db.db_path}")
@@ -30,10 +55,10 @@ class OddsOrchestrator:
         logger.info("=" * 60)
 
         start_time = datetime.now()
+        self.loop_monitor.start()
 
         try:
-            await self._fetch_events()
-            await self._update_odds()
+            await self.run_cycle()
             self._weekly_cleanup()
             self._show_dashboard()
 
@@ -44,15 +69,24 @@ class OddsOrchestrator:
             logger.error(f"❌ Erro durante atualização: {str(e)}", exc_info=True)
             raise
         finally:
+            await self.loop_monitor.stop()
+            logger.info(f"⏱️  {self.loop_monitor.report()}")
+            for line in self.client.latency_report():
+                logger.info(f"⏱️  {line}")
             await self.client.close()
             logger.info("🔌 Conexões fechadas")
 
+    async def run_cycle(self):
+        """Fases de coleta (eventos + odds), sem limpeza nem dashboard"""
+        await self._fetch_events()
+        await self._update_odds()
+
     async def _fetch_events(self):
         logger.info("\n📅 FASE 1: Buscando eventos...")
         events = await self.event_service.fetch_upcoming_events(days_ahead=10)
 
         if events:
-            stats = self.event_service.save_events(events)
+            stats = await self.db_executor.run(self.event_service.save_events, events)
             logger.info(
                 f"✅ Fase 1 concluída - {stats['new']} novos eventos adicionados"
             )
@@ -73,7 +107,8 @@ class OddsOrchestrator:
             logger.info("\n🧹 FASE 3: Limpeza semanal...")
             result = self.dashboard_service.cleanup_old_data(days_keep=30)
             logger.info(
-                f"🧹 Removidos: {result['deleted_events']} eventos, {result['deleted_teams']} times"
+                f"🧹 Removidos: {result['deleted_events']} eventos, {result['deleted_teams']} times, "
+                f"{result['deleted_history']} movimentos de odds"
             )
 
     def _show_dashboard(self):
@@ -5,6 +5,7 @@ from typing import Dict, List
 from src.get_odds.database import OddsDatabase
 from src.shared.core.bet365_client import Bet365Client
 from src.shared.services.rate_limiter import RateLimiter
+from src.shared.services.team_registry import TeamRegistry
 from src.shared.utils.validators import is_lol_event
 
 logger = logging.getLogger("lol_odds")
@@ -143,7 +144,7 @@ class DashboardService:
         self.db = db
 
     def generate(self) -> str:
-        with self.db.get_connection() as conn:
+        with self.db.get_read_connection() as conn:
             lines = ["\n" + "=" * 60, "📊 DASHBOARD - LOL ODDS DATABASE", "=" * 60]
 
             stats = self._get_general_stats(conn)
@@ -154,6 +155,7 @@ class DashboardService:
                     f"  Total de Times: {stats['teams']:,}",
                     f"  Odds Atuais: {stats['odds']:,}",
                     f"  Player Odds: {stats['player_odds']:,}",
+                    f"  Movimentos no Histórico: {stats['history']:,}",
                 ]
             )
 
@@ -202,6 +204,7 @@ class DashboardService:
                 "SELECT COUNT(*) FROM current_odds WHERE odds_type = 'player'"
             ).fetchone()[0],
             "teams": conn.execute("SELECT COUNT(*) FROM teams").fetchone()[0],
+            "history": conn.execute("SELECT COUNT(*) FROM odds_history").fetchone()[0],
         }
 
     def _get_upcoming_stats(self, conn):
@@ -250,10 +253,13 @@ class DashboardService:
         }
 
     def _get_last_update(self, conn):
-        return conn.execute("SELECT MAX(updated_at) FROM current_odds").fetchone()[0]
+        return conn.execute("SELECT MAX(odds_checked_at) FROM events").fetchone()[0]
 
-    def cleanup_old_data(self, days_keep: int = 30) -> dict:
+    def cleanup_old_data(self, days_keep: int = 30, history_days_keep: int = 365) -> dict:
         cutoff_timestamp = int((datetime.now() - timedelta(days=days_keep)).timestamp())
+        history_cutoff = int(
+            (datetime.now() - timedelta(days=history_days_keep)).timestamp()
+        )
 
         with self.db.get_connection() as conn:
             cursor = conn.execute(
@@ -272,8 +278,20 @@ class DashboardService:
             """
             )
             deleted_teams = cursor.rowcount
+            if deleted_teams:
+                TeamRegistry.for_database(self.db.db_path).invalidate()
+
+            # Histórico de odds é mantido por uma temporada, independente dos eventos
+            cursor = conn.execute(
+                "DELETE FROM odds_history WHERE recorded_at < ?", (history_cutoff,)
+            )
+            deleted_history = cursor.rowcount
 
         with self.db.get_connection() as conn:
             conn.execute("VACUUM")
 
-        return {"deleted_events": deleted_events, "deleted_teams": deleted_teams}
+        return {
+            "deleted_events": deleted_events,
+            "deleted_teams": deleted_teams,
+            "deleted_history": deleted_history,
+        }
@@ -1,10 +1,12 @@
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from src.get_odds.database import OddsDatabase
 from src.shared.core.bet365_client import Bet365Client
 from src.shared.services.rate_limiter import RateLimiter
+from src.shared.services.team_registry import TeamRegistry
 from src.shared.utils.validators import is_lol_event
 
 logger = logging.getLogger("lol_odds")
@@ -18,152 +20,363 @@ class EventService:
         self.client = client
         self.rate_limiter = rate_limiter
         self.lol_sport_id = 151
+        self.teams = TeamRegistry.for_database(db.db_path)
 
-    async def fetch_upcoming_events(self, days_ahead: int = 10) -> List[Dict]:
-        events = []
+    async def fetch_upcoming_events(
+        self, days_ahead: int = 10, max_concurrency: int = 12
+    ) -> List[Dict]:
         logger.info(f"🔍 Buscando eventos para os próximos {days_ahead} dias")
 
-        for i in range(days_ahead + 1):
-            target_date = datetime.now() + timedelta(days=i)
-            day_str = target_date.strftime("%Y%m%d")
+        semaphore = asyncio.Semaphore(max_concurrency)
+        days = [
+            (datetime.now() + timedelta(days=i)).strftime("%Y%m%d")
+            for i in range(days_ahead + 1)
+        ]
 
-            try:
-                logger.info(
-                    f"📅 Buscando eventos para {target_date.strftime('%Y-%m-%d')}"
-                )
-                await self.rate_limiter.acquire()
-
-                daily_events = await self.client.upcoming(
-                    sport_id=self.lol_sport_id, day=day_str
-                )
+        # 1ª página de todos os dias em paralelo; o pager diz quantas faltam
+        first_pages = await asyncio.gather(
+            *(self._fetch_upcoming_page(semaphore, day, 1) for day in days)
+        )
+        pages = {(day, 1): data for day, data in zip(days, first_pages)}
 
-                if daily_events.get("success") == 1 and daily_events.get("results"):
-                    lol_events = [e for e in daily_events["results"] if is_lol_event(e)]
-                    events.extend(lol_events)
+        remaining = [
+            (day, page)
+            for day, data in zip(days, first_pages)
+            for page in range(2, self._page_count(data) + 1)
+        ]
+        if remaining:
+            logger.info(f"📄 Buscando {len(remaining)} páginas adicionais")
+            extra_pages = await asyncio.gather(
+                *(self._fetch_upcoming_page(semaphore, day, page) for day, page in remaining)
+            )
+            pages.update(zip(remaining, extra_pages))
 
-                    if lol_events:
-                        logger.info(f"   ✅ {len(lol_events)} jogos de LoL encontrados")
-                    else:
-                        logger.info("   ℹ️  Nenhum jogo de LoL encontrado")
-                else:
-                    logger.info(f"   ℹ️  Nenhum evento encontrado para {day_str}")
+        # Merge determinístico: ordem de dia e página, primeira ocorrência vence
+        events = []
+        seen = set()
+        for day in days:
+            day_events = 0
+            for page in sorted(p for d, p in pages if d == day):
+                data = pages[(day, page)]
+                if not data:
+                    continue
+                for event in data.get("results") or []:
+                    event_id = event.get("id")
+                    if event_id in seen or not is_lol_event(event):
+                        continue
+                    seen.add(event_id)
+                    events.append(event)
+                    day_events += 1
 
-            except Exception as e:
-                logger.error(f"❌ Erro ao buscar eventos para {day_str}: {str(e)}")
+            day_label = datetime.strptime(day, "%Y%m%d").strftime("%Y-%m-%d")
+            if day_events:
+                logger.info(f"📅 {day_label}: ✅ {day_events} jogos de LoL encontrados")
+            else:
+                logger.info(f"📅 {day_label}: ℹ️  Nenhum jogo de LoL encontrado")
 
         logger.info(f"📊 Total de eventos encontrados: {len(events)}")
         return events
 
+    async def _fetch_upcoming_page(
+        self, semaphore: asyncio.Semaphore, day_str: str, page: int
+    ) -> Optional[Dict]:
+        async with semaphore:
+            try:
+                data = await self.client.upcoming(
+                    sport_id=self.lol_sport_id,
+                    day=day_str,
+                    page=page if page > 1 else None,
+                )
+            except Exception as e:
+                logger.error(
+                    f"❌ Erro ao buscar eventos para {day_str} (página {page}): {str(e)}"
+                )
+                return None
+
+        if data.get("success") != 1:
+            logger.info(f"   ℹ️  Nenhum evento encontrado para {day_str}")
+            return None
+        return data
+
+    def _page_count(self, data: Optional[Dict]) -> int:
+        if not data:
+            return 0
+        pager = data.get("pager") or {}
+        try:
+            total = int(pager.get("total", 0))
+            per_page = int(pager.get("per_page", 0))
+        except (TypeError, ValueError):
+            return 1
+        if total <= 0 or per_page <= 0:
+            return 1
+        return -(-total // per_page)
+
     def save_events(self, events: List[Dict]) -> Dict[str, int]:
         stats = {"new": 0, "existing": 0, "updated": 0}
+        if not events:
+            return stats
 
-        with self.db.get_connection() as conn:
-            for event in events:
-                new_event_id = event.get("id")
-                home_info = event.get("home", {})
-                away_info = event.get("away", {})
+        parsed = []
+        for event in events:
+            match_date, match_timestamp = self._parse_match_time(event.get("time"))
+            parsed.append((event, match_date, match_timestamp))
 
-                home_team_id = self._get_or_create_team(
-                    conn, home_info.get("id"), home_info.get("name", "Unknown")
-                )
-                away_team_id = self._get_or_create_team(
-                    conn, away_info.get("id"), away_info.get("name", "Unknown")
-                )
+        try:
+            with self.db.get_connection() as conn:
+                self._reconcile_events(conn, parsed, stats)
+        except Exception:
+            # Times inseridos na transação desfeita não podem ficar no cache
+            self.teams.invalidate()
+            raise
+
+        logger.info(
+            f"📝 Eventos processados - Novos: {stats['new']}, Existentes: {stats['existing']}, Atualizados: {stats['updated']}"
+        )
+        return stats
 
-                league_name = event.get("league", {}).get("name", "Unknown")
-                match_date, match_timestamp = self._parse_match_time(event.get("time"))
+    def _reconcile_events(self, conn, parsed: List, stats: Dict[str, int]):
+        """Classifica os eventos em novos/existentes/remarcados e grava em lote"""
+        events = [event for event, _, _ in parsed]
+        team_ids = self._resolve_teams(conn, events)
+        known_ids = self._load_known_event_ids(
+            conn, [event.get("id") for event in events]
+        )
+        upcoming = self._load_upcoming_index(
+            conn, [ts for _, _, ts in parsed if ts], known_ids
+        )
 
-                # Verificar se evento já existe (mesmo event_id)
-                cursor = conn.execute(
-                    "SELECT 1 FROM events WHERE event_id = ?", (new_event_id,)
+        # Reconciliação em memória, na mesma ordem do processamento sequencial
+        inserts: Dict[str, Dict] = {}
+        for event, match_date, match_timestamp in parsed:
+            new_event_id = event.get("id")
+            home_info = event.get("home", {})
+            away_info = event.get("away", {})
+            home_team_id = team_ids.get(home_info.get("id"))
+            away_team_id = team_ids.get(away_info.get("id"))
+            league_name = event.get("league", {}).get("name", "Unknown")
+
+            if home_team_id is None or away_team_id is None:
+                logger.warning(
+                    f"⚠️ Evento {new_event_id} ignorado: time sem id "
+                    f"({home_info.get('name')} vs {away_info.get('name')})"
                 )
-                if cursor.fetchone():
-                    stats["existing"] += 1
-                    continue
+                continue
 
-                # Verificar duplicata por times + timestamp próximo (±24 horas)
-                if match_timestamp:
-                    cursor = conn.execute(
-                        """
-                        SELECT event_id FROM events 
-                        WHERE home_team_id = ? AND away_team_id = ?
-                        AND ABS(match_timestamp - ?) < 86400
-                        AND status = 'upcoming'
-                    """,
-                        (home_team_id, away_team_id, match_timestamp),
-                    )
+            if new_event_id in known_ids:
+                stats["existing"] += 1
+                continue
 
-                    old_event = cursor.fetchone()
-
-                    if old_event:
-                        old_event_id = old_event[0]
-
-                        # Deletar odds antigas
-                        conn.execute(
-                            "DELETE FROM current_odds WHERE event_id = ?",
-                            (old_event_id,),
-                        )
-
-                        # Atualizar event_id e dados do evento
-                        conn.execute(
-                            """
-                            UPDATE events 
-                            SET event_id = ?, league_name = ?, match_date = ?, match_timestamp = ?, updated_at = datetime('now')
-                            WHERE event_id = ?
-                        """,
-                            (
-                                new_event_id,
-                                league_name,
-                                match_date,
-                                match_timestamp,
-                                old_event_id,
-                            ),
-                        )
-
-                        stats["updated"] += 1
-                        logger.info(
-                            f"🔄 Evento atualizado: {home_info.get('name')} vs {away_info.get('name')} - ID: {old_event_id} → {new_event_id}"
-                        )
-                        continue
+            # Duplicata por times + timestamp próximo (±24 horas)
+            old_event = None
+            if match_timestamp:
+                old_event = self._find_rescheduled(
+                    upcoming, home_team_id, away_team_id, match_timestamp
+                )
 
-                # Inserir novo evento
-                conn.execute(
-                    """
-                    INSERT INTO events 
-                    (event_id, home_team_id, away_team_id, league_name, match_date, match_timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        new_event_id,
-                        home_team_id,
-                        away_team_id,
-                        league_name,
-                        match_date,
-                        match_timestamp,
-                    ),
+            if old_event:
+                old_event_id = old_event["event_id"]
+                known_ids.discard(old_event_id)
+                known_ids.add(new_event_id)
+                old_event.update(
+                    event_id=new_event_id,
+                    league_name=league_name,
+                    match_date=match_date,
+                    match_timestamp=match_timestamp,
+                    dirty=True,
                 )
+                if old_event["origin"] is None:
+                    inserts[new_event_id] = inserts.pop(old_event_id)
 
-                stats["new"] += 1
+                stats["updated"] += 1
                 logger.info(
-                    f"✅ Novo evento: {home_info.get('name')} vs {away_info.get('name')} - {league_name}"
+                    f"🔄 Evento atualizado: {home_info.get('name')} vs {away_info.get('name')} - ID: {old_event_id} → {new_event_id}"
                 )
+                continue
 
-        logger.info(
-            f"📝 Eventos processados - Novos: {stats['new']}, Existentes: {stats['existing']}, Atualizados: {stats['updated']}"
+            entry = {
+                "event_id": new_event_id,
+                "origin": None,
+                "home_team_id": home_team_id,
+                "away_team_id": away_team_id,
+                "league_name": league_name,
+                "match_date": match_date,
+                "match_timestamp": match_timestamp,
+                "dirty": True,
+            }
+            inserts[new_event_id] = entry
+            known_ids.add(new_event_id)
+            if match_timestamp:
+                upcoming.setdefault((home_team_id, away_team_id), []).append(entry)
+
+            stats["new"] += 1
+            logger.info(
+                f"✅ Novo evento: {home_info.get('name')} vs {away_info.get('name')} - {league_name}"
+            )
+
+        renames = [
+            entry
+            for entries in upcoming.values()
+            for entry in entries
+            if entry["origin"] is not None and entry["dirty"]
+        ]
+        self._apply_reconciliation(
+            conn, self._order_renames(renames), list(inserts.values())
         )
-        return stats
 
-    def _get_or_create_team(self, conn, team_id: str, team_name: str) -> int:
-        cursor = conn.execute("SELECT id FROM teams WHERE team_id = ?", (team_id,))
-        existing = cursor.fetchone()
+    @staticmethod
+    def _order_renames(renames: List[Dict]) -> List[Dict]:
+        """
+        Ordem segura das remarcações: um evento só assume o id de outro depois
+        que esse outro já saiu dele (A→B, B→C, C→D vira C→D, B→C, A→B).
+        Em ciclo (A→B, B→A) um deles passa antes por um id temporário.
+        """
+        pending = {entry["origin"]: entry for entry in renames}
+        ordered = []
+        while pending:
+            ready = [
+                entry
+                for origin, entry in pending.items()
+                if entry["event_id"] == origin or entry["event_id"] not in pending
+            ]
+            if not ready:
+                origin, entry = next(iter(pending.items()))
+                temp_id = f"{origin}.tmp"
+                ordered.append({**entry, "event_id": temp_id})
+                del pending[origin]
+                pending[temp_id] = {**entry, "origin": temp_id}
+                continue
+            for entry in ready:
+                ordered.append(entry)
+                del pending[entry["origin"]]
+        return ordered
 
-        if existing:
-            return existing[0]
+    def _resolve_teams(self, conn, events: List[Dict]) -> Dict[str, int]:
+        """Mapa team_id externo -> id interno via registro em memória"""
+        return self.teams.resolve_many(
+            conn,
+            (
+                {
+                    "team_id": event.get(side, {}).get("id"),
+                    "name": event.get(side, {}).get("name", "Unknown"),
+                }
+                for event in events
+                for side in ("home", "away")
+                if event.get(side, {}).get("id") is not None
+            ),
+        )
+
+    def _load_known_event_ids(self, conn, event_ids: List[str], chunk_size: int = 500):
+        """Subconjunto dos event_ids recebidos que já existem no banco"""
+        known = set()
+        unique_ids = list(dict.fromkeys(event_ids))
+        for i in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[i : i + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = conn.execute(
+                f"SELECT event_id FROM events WHERE event_id IN ({placeholders})", chunk
+            )
+            known.update(row[0] for row in cursor)
+        return known
+
+    def _load_upcoming_index(self, conn, timestamps: List[int], known_ids: set) -> Dict:
+        """
+        Eventos 'upcoming' na janela dos timestamps recebidos (±24h), indexados
+        por (home_team_id, away_team_id). A faixa usa idx_events_timestamp.
+        """
+        index: Dict = {}
+        if not timestamps:
+            return index
 
         cursor = conn.execute(
-            "INSERT INTO teams (team_id, name) VALUES (?, ?)", (team_id, team_name)
+            """
+            SELECT event_id, home_team_id, away_team_id, match_timestamp
+            FROM events
+            WHERE match_timestamp > ? AND match_timestamp < ?
+            AND status = 'upcoming'
+        """,
+            (min(timestamps) - 86400, max(timestamps) + 86400),
+        )
+        for event_id, home_team_id, away_team_id, match_timestamp in cursor:
+            index.setdefault((home_team_id, away_team_id), []).append(
+                {
+                    "event_id": event_id,
+                    "origin": event_id,
+                    "match_timestamp": match_timestamp,
+                    "dirty": False,
+                }
+            )
+            known_ids.add(event_id)
+        return index
+
+    def _find_rescheduled(
+        self, upcoming: Dict, home_team_id: int, away_team_id: int, match_timestamp: int
+    ) -> Optional[Dict]:
+        """Evento do mesmo confronto a menos de 24h; o mais próximo vence"""
+        candidates = [
+            entry
+            for entry in upcoming.get((home_team_id, away_team_id), [])
+            if abs(entry["match_timestamp"] - match_timestamp) < 86400
+        ]
+        if not candidates:
+            return None
+        return min(
+            candidates, key=lambda entry: abs(entry["match_timestamp"] - match_timestamp)
         )
-        return cursor.lastrowid
+
+    def _apply_reconciliation(self, conn, renames: List[Dict], inserts: List[Dict]):
+        """Aplica remarcações e inserções com comandos em lote na transação atual"""
+        if renames:
+            old_ids = [(entry["origin"],) for entry in renames]
+
+            # Odds antigas não valem para o novo event_id
+            conn.executemany("DELETE FROM current_odds WHERE event_id = ?", old_ids)
+            conn.executemany("DELETE FROM event_raw_odds WHERE event_id = ?", old_ids)
+            conn.executemany("DELETE FROM odds_schedule WHERE event_id = ?", old_ids)
+
+            # Histórico de odds acompanha o novo event_id
+            conn.executemany(
+                "UPDATE odds_history SET event_id = ? WHERE event_id = ?",
+                [(entry["event_id"], entry["origin"]) for entry in renames],
+            )
+
+            conn.executemany(
+                """
+                UPDATE events 
+                SET event_id = ?, league_name = ?, match_date = ?, match_timestamp = ?,
+                    odds_checked_at = NULL, updated_at = datetime('now')
+                WHERE event_id = ?
+            """,
+                [
+                    (
+                        entry["event_id"],
+                        entry["league_name"],
+                        entry["match_date"],
+                        entry["match_timestamp"],
+                        entry["origin"],
+                    )
+                    for entry in renames
+                ],
+            )
+
+        if inserts:
+            conn.executemany(
+                """
+                INSERT INTO events 
+                (event_id, home_team_id, away_team_id, league_name, match_date, match_timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                [
+                    (
+                        entry["event_id"],
+                        entry["home_team_id"],
+                        entry["away_team_id"],
+                        entry["league_name"],
+                        entry["match_date"],
+                        entry["match_timestamp"],
+                    )
+                    for entry in inserts
+                ],
+            )
 
     def _parse_match_time(self, timestamp):
         if not timestamp:
@@ -0,0 +1,158 @@
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.get_odds.database import OddsDatabase
+
+logger = logging.getLogger("lol_odds")
+
+MarketKey = Tuple[str, str, str]  # (odds_type, market_type, selection)
+
+
+class OddsHistoryService:
+    """Histórico append-only de movimentação de odds para análise de closing line"""
+
+    def __init__(self, db: OddsDatabase):
+        self.db = db
+        self._market_ids: Dict[MarketKey, int] = {}
+
+    def record(
+        self,
+        conn,
+        event_id: str,
+        changes: Iterable[Tuple[MarketKey, str, float]],
+        recorded_at: Optional[int] = None,
+    ) -> int:
+        """
+        Grava mudanças de preço de um evento na mesma transação das odds atuais.
+
+        changes: (chave do mercado, linha, odds) — odds 0 indica linha retirada.
+        """
+        changes = list(changes)
+        if not changes:
+            return 0
+
+        recorded_at = recorded_at or int(time.time())
+        market_ids = self._resolve_market_ids(conn, {key for key, _, _ in changes})
+
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO odds_history
+                (event_id, market_id, line, recorded_at, odds_milli)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            (
+                (event_id, market_ids[key], line, recorded_at, round(odds * 1000))
+                for key, line, odds in changes
+            ),
+        )
+        return len(changes)
+
+    def invalidate(self):
+        """Descarta o cache de ids de mercado (ex.: após rollback)"""
+        self._market_ids.clear()
+
+    def _resolve_market_ids(self, conn, keys: Iterable[MarketKey]) -> Dict[MarketKey, int]:
+        """Interna (odds_type, market_type, selection) em ids inteiros, com cache em memória"""
+        missing = [key for key in keys if key not in self._market_ids]
+
+        if missing:
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO odds_markets (odds_type, market_type, selection)
+                VALUES (?, ?, ?)
+            """,
+                missing,
+            )
+            for key in missing:
+                row = conn.execute(
+                    """
+                    SELECT id FROM odds_markets
+                    WHERE odds_type = ? AND market_type = ? AND selection = ?
+                """,
+                    key,
+                ).fetchone()
+                self._market_ids[key] = row[0]
+
+        return self._market_ids
+
+    def price_at(
+        self,
+        event_id: str,
+        odds_type: str,
+        market_type: str,
+        selection: str,
+        line: str,
+        at: int,
+    ) -> Optional[float]:
+        """Odds vigente de uma linha no instante `at` (unix timestamp)"""
+        with self.db.get_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT h.odds_milli
+                FROM odds_markets m
+                JOIN odds_history h ON h.market_id = m.id
+                WHERE m.odds_type = ? AND m.market_type = ? AND m.selection = ?
+                AND h.event_id = ? AND h.line = ? AND h.recorded_at <= ?
+                ORDER BY h.recorded_at DESC
+                LIMIT 1
+            """,
+                (odds_type, market_type, selection, event_id, line, at),
+            ).fetchone()
+
+        if not row or row[0] == 0:
+            return None
+        return row[0] / 1000
+
+    def opening_closing(self, event_id: str) -> List[Dict]:
+        """Odds de abertura e de fechamento (último preço) de cada linha do evento"""
+        with self.db.get_connection() as conn:
+            cursor = conn.execute(
+                """
+                WITH h AS (
+                    SELECT market_id, line, recorded_at, odds_milli,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY market_id, line ORDER BY recorded_at ASC
+                        ) AS rn_first,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY market_id, line ORDER BY recorded_at DESC
+                        ) AS rn_last,
+                        COUNT(*) OVER (PARTITION BY market_id, line) AS moves
+                    FROM odds_history
+                    WHERE event_id = ? AND odds_milli > 0
+                )
+                SELECT m.odds_type, m.market_type, m.selection, o.line,
+                       o.odds_milli, o.recorded_at, c.odds_milli, c.recorded_at, o.moves
+                FROM h o
+                JOIN h c ON c.market_id = o.market_id AND c.line = o.line AND c.rn_last = 1
+                JOIN odds_markets m ON m.id = o.market_id
+                WHERE o.rn_first = 1
+                ORDER BY m.odds_type, m.market_type, m.selection, o.line
+            """,
+                (event_id,),
+            )
+
+            return [
+                {
+                    "odds_type": odds_type,
+                    "market_type": market_type,
+                    "selection": selection,
+                    "line": line,
+                    "opening_odds": opening / 1000,
+                    "opened_at": opened_at,
+                    "closing_odds": closing / 1000,
+                    "closed_at": closed_at,
+                    "moves": moves,
+                }
+                for (
+                    odds_type,
+                    market_type,
+                    selection,
+                    line,
+                    opening,
+                    opened_at,
+                    closing,
+                    closed_at,
+                    moves,
+                ) in cursor.fetchall()
+            ]
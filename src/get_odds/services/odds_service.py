@@ -3,64 +3,221 @@ import json
 import logging
 import re
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from src.get_odds.database import OddsDatabase
+from src.get_odds.services.odds_history_service import OddsHistoryService
+from src.get_odds.services.refresh_scheduler import RefreshScheduler
+from src.shared.config.settings import settings
+from src.shared.core.async_db import DatabaseExecutor
 from src.shared.core.bet365_client import Bet365Client
 from src.shared.services.rate_limiter import RateLimiter
+from src.shared.utils.compression import compress_json, decompress_json
 
 logger = logging.getLogger("lol_odds")
 
 
+class OddRow(NamedTuple):
+    """Linha de current_odds acumulada em memória antes do flush em lote"""
+
+    event_id: str
+    odds_type: str
+    market_type: str
+    selection: str
+    odds: float
+    line: str
+    map_number: Optional[int]
+    raw: Dict
+
+    @property
+    def key(self) -> Tuple[str, str, str, str]:
+        """Chave natural (sem event_id) usada pelo índice único de current_odds"""
+        return (self.odds_type, self.market_type, self.selection, self.line)
+
+
 class OddsService:
+    # "replace" apaga e reinsere tudo sem diff: não alimenta odds_history
+    # nem a volatilidade do RefreshScheduler
+    WRITE_MODES = ("upsert", "replace")
+    RAW_POLICIES = ("off", "event", "row")
+
     def __init__(
-        self, db: OddsDatabase, client: Bet365Client, rate_limiter: RateLimiter
+        self,
+        db: OddsDatabase,
+        client: Bet365Client,
+        rate_limiter: RateLimiter,
+        write_mode: str = "upsert",
+        history: Optional[OddsHistoryService] = None,
+        raw_policy: Optional[str] = None,
+        scheduler: Optional[RefreshScheduler] = None,
+        db_executor: Optional[DatabaseExecutor] = None,
     ):
+        raw_policy = raw_policy or settings.RAW_ODDS_POLICY
+        if write_mode not in self.WRITE_MODES:
+            raise ValueError(f"Modo de escrita inválido: {write_mode}")
+        if raw_policy not in self.RAW_POLICIES:
+            raise ValueError(f"Política de raw_data inválida: {raw_policy}")
+
         self.db = db
         self.client = client
         self.rate_limiter = rate_limiter
-        self.semaphore = asyncio.Semaphore(10)
-        self.cache = {}
+        self.write_mode = write_mode
+        self.history = history
+        self.raw_policy = raw_policy
+        self.scheduler = scheduler
+        # Toda gravação roda na thread do banco, fora do event loop
+        self.db_executor = db_executor or DatabaseExecutor.for_database(db.db_path)
+        self.workers = settings.ODDS_FETCH_WORKERS
+        self.pipeline_stats = {}
+        self.write_stats = {
+            "events": 0,
+            "rows": 0,
+            "seconds": 0.0,
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "removed": 0,
+            "history": 0,
+        }
 
     async def fetch_and_save_odds(
-        self, hours_old_threshold: int = 2, batch_size: int = 10
+        self,
+        hours_old_threshold: int = 2,
+        batch_size: int = 10,
+        workers: Optional[int] = None,
     ) -> int:
-        events_to_update = self._get_events_to_update(hours_old_threshold)
+        """
+        Pipeline contínuo: `workers` tarefas buscam odds e alimentam uma fila
+        limitada; um único writer grava os resultados em grupos de até
+        `batch_size` eventos por transação.
+        """
+        if self.scheduler:
+            events_to_update = await self.db_executor.run(self.scheduler.due_events)
+        else:
+            events_to_update = await self.db_executor.run(
+                self._get_events_to_update, hours_old_threshold
+            )
 
         if not events_to_update:
             logger.info("✅ Todos os eventos têm odds atualizadas")
             return 0
 
+        workers = min(workers or self.workers, len(events_to_update))
         logger.info(
-            f"💰 Coletando odds para {len(events_to_update)} eventos em lotes de {batch_size}"
+            f"💰 Coletando odds para {len(events_to_update)} eventos "
+            f"({workers} workers, gravação em grupos de {batch_size})"
         )
-        odds_collected = 0
 
-        for i in range(0, len(events_to_update), batch_size):
-            batch = events_to_update[i : i + batch_size]
-            logger.info(
-                f"   📦 Processando lote {i // batch_size + 1}/{(len(events_to_update) - 1) // batch_size + 1}"
+        self.pipeline_stats = {
+            "fetch_seconds": 0.0,
+            "fetch_blocked_seconds": 0.0,
+            "writer_idle_seconds": 0.0,
+            "write_seconds": 0.0,
+            "groups": 0,
+        }
+        pending = iter(events_to_update)
+        # Fila limitada: se o writer atrasar, os workers esperam (backpressure)
+        results: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+
+        start = time.perf_counter()
+        writer = asyncio.create_task(self._odds_writer(results, batch_size))
+        fetchers = [
+            asyncio.create_task(self._odds_fetch_worker(pending, results))
+            for _ in range(workers)
+        ]
+        fetching = asyncio.gather(*fetchers)
+        # Cancelado junto com o writer, o gather termina com CancelledError: já tratado
+        fetching.add_done_callback(lambda future: future.cancelled() or future.exception())
+        try:
+            # Se o writer cair, a fila lotada prenderia os workers para sempre
+            await self._unless_writer_fails(fetching, writer)
+            await self._unless_writer_fails(
+                asyncio.ensure_future(results.put(None)), writer
             )
+            odds_collected = await writer
+        except BaseException:
+            for task in [fetching, writer] + fetchers:
+                task.cancel()
+            raise
+        elapsed = time.perf_counter() - start
 
-            tasks = [
-                self._fetch_odds_for_event(event_id, home, away)
-                for event_id, home, away in batch
-            ]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(
+            f"📊 Coleta finalizada: {odds_collected}/{len(events_to_update)} eventos com odds "
+            f"em {elapsed:.1f}s"
+        )
+        self._log_pipeline_stats(elapsed)
+        self._log_write_stats()
+        return odds_collected
 
-            for result in results:
-                if isinstance(result, Exception):
-                    logger.error(f"      ❌ Erro em tarefa: {str(result)}")
-                elif result:
-                    odds_collected += 1
+    @staticmethod
+    async def _unless_writer_fails(task: asyncio.Future, writer: asyncio.Task):
+        """Espera `task`; se o writer terminar antes (só por erro), propaga o erro dele"""
+        done, _ = await asyncio.wait({task, writer}, return_when=asyncio.FIRST_COMPLETED)
+        if task in done:
+            return task.result()
+        task.cancel()
+        writer.result()
+
+    async def _odds_fetch_worker(self, pending, results: asyncio.Queue):
+        # O iterador compartilhado distribui o próximo evento ao worker livre
+        for event_id, home, away in pending:
+            start = time.perf_counter()
+            fetched = await self._fetch_odds_for_event(event_id, home, away)
+            self.pipeline_stats["fetch_seconds"] += time.perf_counter() - start
+
+            if fetched is None:
+                continue
+            start = time.perf_counter()
+            await results.put(fetched)
+            self.pipeline_stats["fetch_blocked_seconds"] += time.perf_counter() - start
 
-            if i + batch_size < len(events_to_update):
-                await asyncio.sleep(0.5)
+    async def _odds_writer(self, results: asyncio.Queue, batch_size: int) -> int:
+        odds_collected = 0
+        done = False
+        while not done:
+            start = time.perf_counter()
+            group = [await results.get()]
+            self.pipeline_stats["writer_idle_seconds"] += time.perf_counter() - start
+
+            # Agrupa o que já estiver na fila, sem esperar mais
+            while len(group) < batch_size and not results.empty():
+                group.append(results.get_nowait())
+            if None in group:
+                done = True
+                group = [item for item in group if item is not None]
+            if not group:
+                continue
+
+            start = time.perf_counter()
+            odds_collected += await self.db_executor.run(self._save_odds_group, group)
+            self.pipeline_stats["write_seconds"] += time.perf_counter() - start
+            self.pipeline_stats["groups"] += 1
+        return odds_collected
 
+    def _log_pipeline_stats(self, elapsed: float):
+        stats = self.pipeline_stats
         logger.info(
-            f"📊 Coleta finalizada: {odds_collected}/{len(events_to_update)} eventos com odds"
+            f"⏱️  Etapas: fetch {stats['fetch_seconds']:.1f}s (somado entre workers), "
+            f"workers bloqueados na fila {stats['fetch_blocked_seconds']:.1f}s, "
+            f"writer ocioso {stats['writer_idle_seconds']:.1f}s, "
+            f"gravação {stats['write_seconds']:.1f}s em {stats['groups']} grupos "
+            f"(total {elapsed:.1f}s)"
+        )
+
+    def _log_write_stats(self):
+        stats = self.write_stats
+        rows = stats["rows"]
+        seconds = stats["seconds"]
+        rate = rows / seconds if seconds > 0 else 0.0
+        logger.info(
+            f"💾 Escrita de odds: {rows} linhas em {stats['events']} eventos "
+            f"({seconds:.2f}s, {rate:,.0f} linhas/s)"
+        )
+        logger.info(
+            f"   Inseridas: {stats['inserted']}, Atualizadas: {stats['updated']}, "
+            f"Inalteradas: {stats['unchanged']}, Removidas: {stats['removed']}, "
+            f"Histórico: {stats['history']}"
         )
-        return odds_collected
 
     def _get_events_to_update(self, hours_old: int) -> List[Tuple[str, str, str]]:
         with self.db.get_connection() as conn:
@@ -70,103 +227,379 @@ class OddsService:
                 FROM events e
                 JOIN teams ht ON e.home_team_id = ht.id
                 JOIN teams at ON e.away_team_id = at.id
-                LEFT JOIN current_odds co ON e.event_id = co.event_id
                 WHERE e.status = 'upcoming'
-                AND (co.event_id IS NULL OR datetime(co.updated_at) < datetime('now', ?))
+                AND (
+                    e.odds_checked_at IS NULL
+                    OR datetime(e.odds_checked_at) < datetime('now', ?)
+                )
                 ORDER BY e.match_timestamp ASC
             """,
                 (f"-{hours_old} hours",),
             )
             return cursor.fetchall()
 
-    async def _fetch_odds_for_event(self, event_id: str, home: str, away: str) -> bool:
-        async with self.semaphore:
-            try:
-                cache_key = f"{event_id}_{int(time.time() / 3600)}"
-                if cache_key in self.cache:
-                    logger.debug(f"      ♻️  Usando cache para {home} vs {away}")
-                    return True
-
-                await self.rate_limiter.acquire()
-
-                logger.debug(f"      📡 Buscando odds para {home} vs {away}")
-                odds_data = await self.client.prematch(FI=event_id)
-
-                if (
-                    odds_data
-                    and odds_data.get("success") == 1
-                    and odds_data.get("results")
-                ):
-                    result = odds_data["results"][0]
-                    self._save_odds_data(event_id, result)
-
-                    self.cache[cache_key] = True
-                    if len(self.cache) > 1000:
-                        self.cache.pop(next(iter(self.cache)))
-
-                    logger.debug(f"      ✅ Odds salvas para {home} vs {away}")
-                    return True
-                else:
-                    logger.debug(f"      ⚠️ Sem odds disponíveis para {home} vs {away}")
-                    return False
-
-            except Exception as e:
-                logger.error(
-                    f"      ❌ Erro ao coletar odds para {home} vs {away}: {str(e)}"
-                )
-                return False
+    async def _fetch_odds_for_event(
+        self, event_id: str, home: str, away: str
+    ) -> Optional[Tuple[str, Optional[Dict]]]:
+        """
+        Busca as odds de um evento. Retorna (event_id, payload) para o writer,
+        com payload None quando não há odds; None em caso de erro.
+        """
+        try:
+            logger.debug(f"      📡 Buscando odds para {home} vs {away}")
+            odds_data = await self.client.prematch(FI=event_id)
 
-    def _save_odds_data(self, event_id: str, odds_data: Dict):
-        with self.db.get_connection() as conn:
-            conn.execute("DELETE FROM current_odds WHERE event_id = ?", (event_id,))
+            if odds_data and odds_data.get("success") == 1 and odds_data.get("results"):
+                return event_id, odds_data["results"][0]
+
+            logger.debug(f"      ⚠️ Sem odds disponíveis para {home} vs {away}")
+            return event_id, None
+
+        except Exception as e:
+            logger.error(
+                f"      ❌ Erro ao coletar odds para {home} vs {away}: {str(e)}"
+            )
+            return None
+
+    def _save_odds_group(self, group: List[Tuple[str, Optional[Dict]]]) -> int:
+        """Grava vários eventos numa transação; se falhar, tenta um a um"""
+        start = time.perf_counter()
+        written = []
+        try:
+            with self.db.get_connection() as conn:
+                for event_id, odds_data in group:
+                    if odds_data is None:
+                        if self.scheduler:
+                            self.scheduler.record(conn, event_id)
+                        continue
+                    written.append(self._write_odds_data(conn, event_id, odds_data))
+        except Exception as e:
+            # Ids de mercado internados nesta transação foram desfeitos pelo rollback
+            if self.history:
+                self.history.invalidate()
+            if len(group) == 1:
+                logger.error(f"      ❌ Erro ao salvar odds de {group[0][0]}: {str(e)}")
+                return 0
+            logger.warning(
+                f"      ⚠️ Falha no grupo de {len(group)} eventos, gravando um a um: {str(e)}"
+            )
+            return sum(self._save_odds_group([item]) for item in group)
 
-            # Salvar FI e bet365_key no evento
-            FI = odds_data.get("FI")
-            bet365_key = None
-            if "main" in odds_data and "key" in odds_data["main"]:
-                bet365_key = odds_data["main"]["key"]
+        self._add_write_stats(written, time.perf_counter() - start)
+        return len(written)
 
+    def _save_odds_data(self, event_id: str, odds_data: Dict) -> Dict[str, int]:
+        start = time.perf_counter()
+        try:
+            with self.db.get_connection() as conn:
+                counts = self._write_odds_data(conn, event_id, odds_data)
+        except Exception:
+            if self.history:
+                self.history.invalidate()
+            raise
+        self._add_write_stats([counts], time.perf_counter() - start)
+        return counts
+
+    def _write_odds_data(self, conn, event_id: str, odds_data: Dict) -> Dict[str, int]:
+        rows = self._unique_rows(self._collect_odds_rows(event_id, odds_data))
+
+        # Salvar FI e bet365_key no evento
+        FI = odds_data.get("FI")
+        bet365_key = None
+        if "main" in odds_data and "key" in odds_data["main"]:
+            bet365_key = odds_data["main"]["key"]
+
+        if self.write_mode == "upsert":
+            counts = self._upsert_rows(conn, event_id, rows)
+        else:
+            counts = self._replace_rows(conn, event_id, rows)
+
+        conn.execute(
+            """
+            UPDATE events 
+            SET FI = ?, bet365_key = ?, odds_checked_at = datetime('now')
+            WHERE event_id = ?
+        """,
+            (FI, bet365_key, event_id),
+        )
+
+        if self.raw_policy == "event":
             conn.execute(
                 """
-                UPDATE events 
-                SET FI = ?, bet365_key = ? 
-                WHERE event_id = ?
+                INSERT OR REPLACE INTO event_raw_odds (event_id, payload, updated_at)
+                VALUES (?, ?, datetime('now'))
             """,
-                (FI, bet365_key, event_id),
+                (event_id, compress_json(odds_data)),
             )
 
-            total = 0
+        if self.scheduler:
+            # No modo replace todas as linhas são "novas": sem sinal de volatilidade
+            self.scheduler.record(
+                conn, event_id, counts if self.write_mode == "upsert" else None
+            )
+
+        logger.debug(
+            f"      📊 {event_id}: {len(rows)} odds ({counts['inserted']} novas, "
+            f"{counts['updated']} alteradas, {counts['unchanged']} inalteradas, "
+            f"{counts['removed']} removidas)"
+        )
+        return counts
+
+    def _add_write_stats(self, written: List[Dict[str, int]], elapsed: float):
+        """Contabiliza só depois do commit, para não contar grupos desfeitos"""
+        self.write_stats["events"] += len(written)
+        self.write_stats["seconds"] += elapsed
+        for counts in written:
+            self.write_stats["rows"] += (
+                counts["inserted"] + counts["updated"] + counts["removed"] + counts["history"]
+            )
+            for key, value in counts.items():
+                self.write_stats[key] += value
 
-            # Processar main (match_lines apenas)
-            if "main" in odds_data and "sp" in odds_data["main"]:
-                total += self._process_main_section(
-                    conn, event_id, odds_data["main"]["sp"]
+    def _replace_rows(self, conn, event_id: str, rows: List[OddRow]) -> Dict[str, int]:
+        """Modo legado: apaga todas as odds do evento e reinsere o payload inteiro"""
+        cursor = conn.execute(
+            "DELETE FROM current_odds WHERE event_id = ?", (event_id,)
+        )
+        removed = max(cursor.rowcount, 0)
+        self._flush_rows(conn, rows)
+        return {
+            "inserted": len(rows),
+            "updated": 0,
+            "unchanged": 0,
+            "removed": removed,
+            "history": 0,
+        }
+
+    def _upsert_rows(self, conn, event_id: str, rows: List[OddRow]) -> Dict[str, int]:
+        """Grava apenas o que mudou em relação às odds atuais do evento"""
+        existing = {
+            (odds_type, market_type, selection, line): (row_id, odds, map_number)
+            for row_id, odds_type, market_type, selection, line, odds, map_number in conn.execute(
+                """
+                SELECT id, odds_type, market_type, selection, line, odds, map_number
+                FROM current_odds WHERE event_id = ?
+            """,
+                (event_id,),
+            )
+        }
+
+        inserted: List[OddRow] = []
+        updated: List[Tuple[OddRow, int]] = []
+        moved: List[OddRow] = []
+        unchanged = 0
+
+        for row in rows:
+            current = existing.pop(row.key, None)
+            if current is None:
+                inserted.append(row)
+                moved.append(row)
+            elif current[1] != row.odds or current[2] != row.map_number:
+                updated.append((row, current[0]))
+                if current[1] != row.odds:
+                    moved.append(row)
+            else:
+                unchanged += 1
+
+        # O que sobrou em existing não veio no payload: linha retirada
+        removed_ids = [(row_id,) for row_id, _, _ in existing.values()]
+
+        history = 0
+        if self.history:
+            changes = [(row.key[:3], row.line, row.odds) for row in moved]
+            changes.extend((key[:3], key[3], 0.0) for key in existing)
+            history = self.history.record(conn, event_id, changes)
+
+        if removed_ids:
+            conn.executemany("DELETE FROM current_odds WHERE id = ?", removed_ids)
+
+        if updated:
+            conn.executemany(
+                """
+                UPDATE current_odds
+                SET odds = ?, map_number = ?, raw_data = ?, updated_at = datetime('now')
+                WHERE id = ?
+            """,
+                (
+                    (row.odds, row.map_number, self._raw_value(row), row_id)
+                    for row, row_id in updated
+                ),
+            )
+
+        self._flush_rows(conn, inserted)
+
+        if unchanged and self.raw_policy != "row":
+            # raw_data legado (texto por linha) das linhas inalteradas: o payload
+            # já está em event_raw_odds (ou foi descartado com a política "off")
+            conn.execute(
+                "UPDATE current_odds SET raw_data = NULL WHERE event_id = ? AND raw_data IS NOT NULL",
+                (event_id,),
+            )
+
+        return {
+            "inserted": len(inserted),
+            "updated": len(updated),
+            "unchanged": unchanged,
+            "removed": len(removed_ids),
+            "history": history,
+        }
+
+    def _unique_rows(self, rows: List[OddRow]) -> List[OddRow]:
+        """Remove seleções repetidas no payload (a última ocorrência prevalece)"""
+        unique = {}
+        for row in rows:
+            unique[row.key] = row
+        return list(unique.values())
+
+    def _collect_odds_rows(self, event_id: str, odds_data: Dict) -> List[OddRow]:
+        """Converte o payload de prematch nas linhas de current_odds, sem tocar no banco"""
+        rows: List[OddRow] = []
+
+        # Processar main (match_lines apenas)
+        if "main" in odds_data and "sp" in odds_data["main"]:
+            self._process_main_section(rows, event_id, odds_data["main"]["sp"])
+
+        # Processar map_1 e map_2
+        for map_section in ["map_1", "map_2"]:
+            if map_section in odds_data and "sp" in odds_data[map_section]:
+                map_num = self._extract_map_number(map_section)
+                self._process_map_section(
+                    rows,
+                    event_id,
+                    map_section,
+                    odds_data[map_section]["sp"],
+                    map_num,
                 )
 
-            # Processar map_1 e map_2
-            for map_section in ["map_1", "map_2"]:
-                if map_section in odds_data and "sp" in odds_data[map_section]:
-                    map_num = self._extract_map_number(map_section)
-                    total += self._process_map_section(
-                        conn,
-                        event_id,
-                        map_section,
-                        odds_data[map_section]["sp"],
-                        map_num,
+        # Processar player odds
+        if "player" in odds_data and "sp" in odds_data["player"]:
+            player_odds = self._process_player_odds(
+                rows, event_id, odds_data["player"]["sp"]
+            )
+            if player_odds > 0:
+                logger.debug(f"      🎮 {player_odds} player odds processadas")
+
+        return rows
+
+    def _flush_rows(self, conn, rows: List[OddRow]) -> int:
+        """Grava todas as linhas do evento com um único executemany"""
+        if not rows:
+            return 0
+
+        conn.executemany(
+            """
+            INSERT INTO current_odds 
+            (event_id, odds_type, market_type, selection, odds, line, map_number, raw_data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            (
+                (
+                    row.event_id,
+                    row.odds_type,
+                    row.market_type,
+                    row.selection,
+                    row.odds,
+                    row.line,
+                    row.map_number,
+                    self._raw_value(row),
+                )
+                for row in rows
+            ),
+        )
+        return len(rows)
+
+    def _raw_value(self, row: OddRow):
+        """raw_data por linha só existe na política "row", sempre comprimido"""
+        if self.raw_policy == "row":
+            return compress_json(row.raw)
+        return None
+
+    def get_raw_payload(self, event_id: str) -> Optional[Dict]:
+        """Payload de prematch guardado na política "event" (None se não houver)"""
+        with self.db.get_connection() as conn:
+            row = conn.execute(
+                "SELECT payload FROM event_raw_odds WHERE event_id = ?", (event_id,)
+            ).fetchone()
+        return decompress_json(row[0]) if row else None
+
+    def migrate_raw_data(self, policy: str, batch_size: int = 5000) -> Dict[str, int]:
+        """
+        Reescreve current_odds.raw_data das linhas existentes para a política indicada.
+
+        Na política "event" os raw_data antigos de cada evento viram um único blob
+        (lista das odds originais), já que o payload completo não está mais disponível.
+        """
+        if policy not in self.RAW_POLICIES:
+            raise ValueError(f"Política de raw_data inválida: {policy}")
+
+        stats = {"rows": 0, "events": 0}
+
+        with self.db.get_connection() as conn:
+            if policy == "event":
+                events = conn.execute(
+                    """
+                    SELECT DISTINCT co.event_id FROM current_odds co
+                    WHERE co.raw_data IS NOT NULL
+                    AND co.event_id NOT IN (SELECT event_id FROM event_raw_odds)
+                """
+                ).fetchall()
+                for (event_id,) in events:
+                    odds = [
+                        decompress_json(raw)
+                        for (raw,) in conn.execute(
+                            """
+                            SELECT raw_data FROM current_odds
+                            WHERE event_id = ? AND raw_data IS NOT NULL
+                            ORDER BY id
+                        """,
+                            (event_id,),
+                        )
+                    ]
+                    conn.execute(
+                        "INSERT INTO event_raw_odds (event_id, payload) VALUES (?, ?)",
+                        (event_id, compress_json({"odds": odds})),
                     )
+                    stats["events"] += 1
 
-            # Processar player odds
-            if "player" in odds_data and "sp" in odds_data["player"]:
-                player_odds = self._process_player_odds(
-                    conn, event_id, odds_data["player"]["sp"]
+            if policy in ("off", "event"):
+                cursor = conn.execute(
+                    "UPDATE current_odds SET raw_data = NULL WHERE raw_data IS NOT NULL"
                 )
-                total += player_odds
-                if player_odds > 0:
-                    logger.debug(f"      🎮 {player_odds} player odds processadas")
+                stats["rows"] = cursor.rowcount
+            else:
+                # Apenas linhas ainda em texto (JSON antigo) precisam ser comprimidas
+                while True:
+                    rows = conn.execute(
+                        """
+                        SELECT id, raw_data FROM current_odds
+                        WHERE typeof(raw_data) = 'text'
+                        LIMIT ?
+                    """,
+                        (batch_size,),
+                    ).fetchall()
+                    if not rows:
+                        break
+                    conn.executemany(
+                        "UPDATE current_odds SET raw_data = ? WHERE id = ?",
+                        [(compress_json(json.loads(raw)), row_id) for row_id, raw in rows],
+                    )
+                    stats["rows"] += len(rows)
+
+            if policy in ("off", "row"):
+                cursor = conn.execute("DELETE FROM event_raw_odds")
+                stats["events"] = cursor.rowcount
+
+        with self.db.get_connection() as conn:
+            conn.execute("VACUUM")
 
-            logger.debug(f"      📊 {total} odds processadas")
+        logger.info(
+            f"🗜️ raw_data migrado para '{policy}': {stats['rows']} linhas, {stats['events']} eventos"
+        )
+        return stats
 
-    def _process_main_section(self, conn, event_id: str, markets: Dict) -> int:
+    def _process_main_section(
+        self, rows: List[OddRow], event_id: str, markets: Dict
+    ) -> int:
         """Processa apenas match_lines do main"""
         allowed_markets = {"match_lines"}
         count = 0
@@ -179,14 +612,19 @@ class OddsService:
                 market_type = market_data.get("name", market_key)
                 for odd in market_data["odds"]:
                     if isinstance(odd, dict):
-                        count += self._save_single_odd(
-                            conn, event_id, "main", market_type, odd
+                        count += self._append_odd(
+                            rows, event_id, "main", market_type, odd
                         )
 
         return count
 
     def _process_map_section(
-        self, conn, event_id: str, section: str, markets: Dict, map_number: int
+        self,
+        rows: List[OddRow],
+        event_id: str,
+        section: str,
+        markets: Dict,
+        map_number: int,
     ) -> int:
         """Processa apenas mercados permitidos por mapa"""
         allowed_markets = {
@@ -206,8 +644,8 @@ class OddsService:
                 market_type = market_data.get("name", market_key)
                 for odd in market_data["odds"]:
                     if isinstance(odd, dict):
-                        count += self._save_single_odd(
-                            conn, event_id, section, market_type, odd, map_number
+                        count += self._append_odd(
+                            rows, event_id, section, market_type, odd, map_number
                         )
 
         return count
@@ -216,7 +654,9 @@ class OddsService:
         match = re.search(r"map_(\d+)", section.lower())
         return int(match.group(1)) if match else None
 
-    def _process_player_odds(self, conn, event_id: str, markets: Dict) -> int:
+    def _process_player_odds(
+        self, rows: List[OddRow], event_id: str, markets: Dict
+    ) -> int:
         """Processa apenas player odds permitidos"""
         allowed_markets = {
             "map_1_player_total_kills",
@@ -240,15 +680,15 @@ class OddsService:
 
             for odd in market_data["odds"]:
                 if isinstance(odd, dict):
-                    count += self._save_single_odd(
-                        conn, event_id, "player", market_type, odd, map_number
+                    count += self._append_odd(
+                        rows, event_id, "player", market_type, odd, map_number
                     )
 
         return count
 
     def _process_odds_section(
         self,
-        conn,
+        rows: List[OddRow],
         event_id: str,
         section: str,
         markets: Dict,
@@ -260,8 +700,8 @@ class OddsService:
                 market_type = f"{section}_{market_key}"
                 for odd in market_data:
                     if isinstance(odd, dict):
-                        count += self._save_single_odd(
-                            conn, event_id, section, market_type, odd, map_number
+                        count += self._append_odd(
+                            rows, event_id, section, market_type, odd, map_number
                         )
                 continue
 
@@ -271,15 +711,15 @@ class OddsService:
             market_type = market_data.get("name", market_key)
             for odd in market_data["odds"]:
                 if isinstance(odd, dict):
-                    count += self._save_single_odd(
-                        conn, event_id, section, market_type, odd, map_number
+                    count += self._append_odd(
+                        rows, event_id, section, market_type, odd, map_number
                     )
 
         return count
 
-    def _save_single_odd(
+    def _append_odd(
         self,
-        conn,
+        rows: List[OddRow],
         event_id: str,
         section: str,
         market_type: str,
@@ -292,17 +732,13 @@ class OddsService:
             selection = f"{header} {name}".strip() if header else name
             odds = float(odd.get("odds", 0))
             line = odd.get("handicap", "")
+            line = "" if line is None else str(line)
 
             if odds == 0:
                 return 0
 
-            conn.execute(
-                """
-                INSERT INTO current_odds 
-                (event_id, odds_type, market_type, selection, odds, line, map_number, raw_data)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
+            rows.append(
+                OddRow(
                     event_id,
                     section,
                     market_type,
@@ -310,11 +746,10 @@ class OddsService:
                     odds,
                     line,
                     map_number,
-                    json.dumps(odd),
-                ),
+                    odd,
+                )
             )
-
             return 1
         except Exception as e:
-            logger.error(f"❌ Erro ao salvar odd: {str(e)}")
+            logger.error(f"❌ Erro ao processar odd: {str(e)}")
             return 0
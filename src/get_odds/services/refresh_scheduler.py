@@ -0,0 +1,154 @@
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.get_odds.database import OddsDatabase
+from src.shared.services.rate_limiter import RateLimiter
+
+logger = logging.getLogger("lol_odds")
+
+
+class RefreshScheduler:
+    """
+    Agenda de coleta de odds por evento (tabela odds_schedule).
+
+    O intervalo base depende do tempo até o início da partida e é ajustado
+    pela volatilidade observada (fração das linhas que mudou a cada coleta).
+    A cada execução só entram os eventos vencidos, mais próximos do início
+    primeiro, até o orçamento disponível no RateLimiter.
+    """
+
+    # (segundos até o início, intervalo base em segundos)
+    TIERS = (
+        (2 * 3600, 10 * 60),
+        (6 * 3600, 30 * 60),
+        (24 * 3600, 60 * 60),
+        (72 * 3600, 3 * 3600),
+        (7 * 86400, 12 * 3600),
+    )
+    FAR_INTERVAL = 86400
+    MIN_INTERVAL = 5 * 60
+    # Eventos que começaram há mais que isso não têm mais odds pré-jogo
+    STARTED_GRACE = 3 * 3600
+    VOLATILITY_ALPHA = 0.5
+
+    def __init__(
+        self,
+        db: OddsDatabase,
+        rate_limiter: Optional[RateLimiter] = None,
+        reserve: int = 0,
+        max_per_run: Optional[int] = None,
+    ):
+        self.db = db
+        self.rate_limiter = rate_limiter
+        self.reserve = reserve
+        self.max_per_run = max_per_run
+
+    def due_events(self, now: Optional[int] = None) -> List[Tuple[str, str, str]]:
+        """Eventos vencidos (event_id, casa, fora) dentro do orçamento da execução"""
+        now = now or int(time.time())
+        with self.db.get_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT e.event_id, ht.name, at.name
+                FROM events e
+                JOIN teams ht ON e.home_team_id = ht.id
+                JOIN teams at ON e.away_team_id = at.id
+                LEFT JOIN odds_schedule s ON s.event_id = e.event_id
+                WHERE e.status = 'upcoming'
+                AND (e.match_timestamp IS NULL OR e.match_timestamp > ?)
+                AND (s.next_due_at IS NULL OR s.next_due_at <= ?)
+                ORDER BY e.match_timestamp ASC
+            """,
+                (now - self.STARTED_GRACE, now),
+            )
+            due = cursor.fetchall()
+
+        budget = self.budget()
+        if budget is not None and len(due) > budget:
+            logger.info(
+                f"⏳ {len(due)} eventos vencidos, orçamento de {budget} requisições - "
+                f"{len(due) - budget} ficam para a próxima execução"
+            )
+            due = due[:budget]
+        return due
+
+    def budget(self) -> Optional[int]:
+        """Requisições que a coleta pode gastar agora (None = sem limite)"""
+        limits = []
+        if self.rate_limiter:
+            limits.append(max(0, self.rate_limiter.available() - self.reserve))
+        if self.max_per_run:
+            limits.append(self.max_per_run)
+        return min(limits) if limits else None
+
+    def record(
+        self,
+        conn,
+        event_id: str,
+        counts: Optional[Dict[str, int]] = None,
+        now: Optional[int] = None,
+    ):
+        """
+        Agenda a próxima coleta na transação de `conn`. `counts` vem da escrita
+        das odds (modo upsert); sem ele a volatilidade anterior é mantida.
+        """
+        now = now or int(time.time())
+        row = conn.execute(
+            """
+            SELECT e.match_timestamp, s.volatility
+            FROM events e
+            LEFT JOIN odds_schedule s ON s.event_id = e.event_id
+            WHERE e.event_id = ?
+        """,
+            (event_id,),
+        ).fetchone()
+        if not row:
+            return
+
+        match_timestamp, volatility = row
+        observed = self._observed_volatility(counts)
+        if observed is not None:
+            volatility = (
+                observed
+                if volatility is None
+                else self.VOLATILITY_ALPHA * observed
+                + (1 - self.VOLATILITY_ALPHA) * volatility
+            )
+
+        interval = self.interval_for(match_timestamp, volatility, now)
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO odds_schedule
+                (event_id, next_due_at, interval_seconds, volatility, last_checked_at)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            (event_id, now + interval, interval, volatility, now),
+        )
+
+    def interval_for(
+        self, match_timestamp: Optional[int], volatility: Optional[float], now: int
+    ) -> int:
+        interval = self.FAR_INTERVAL
+        if match_timestamp:
+            time_to_start = match_timestamp - now
+            for limit, tier_interval in self.TIERS:
+                if time_to_start <= limit:
+                    interval = tier_interval
+                    break
+
+        if volatility is not None:
+            if volatility >= 0.2:
+                interval //= 2
+            elif volatility < 0.01:
+                interval *= 2
+
+        return max(self.MIN_INTERVAL, min(self.FAR_INTERVAL, interval))
+
+    def _observed_volatility(self, counts: Optional[Dict[str, int]]) -> Optional[float]:
+        if not counts:
+            return None
+        total = counts["inserted"] + counts["updated"] + counts["unchanged"]
+        if not total:
+            return None
+        return (counts["inserted"] + counts["updated"] + counts["removed"]) / total
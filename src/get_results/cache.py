@@ -9,6 +9,8 @@ from typing import Dict, Optional, Tuple
 
 import pandas as pd
 
+from src.shared.utils.csv_snapshot import CsvSnapshot
+
 from .config import Config, setup_logger
 from .database import connection_pool
 from .models import GameStats, TeamInfo
@@ -134,19 +136,19 @@ class CacheManager:
                 self.csv_data = pd.DataFrame()
             else:
                 try:
-                    self.csv_data = pd.read_csv(Config.CSV_MATCHES, low_memory=False)
+                    # Snapshot colunar já tipado (refeito sozinho quando o CSV muda)
+                    self.csv_data = CsvSnapshot(Config.CSV_MATCHES).load()
 
                     # Processar datas
                     if "date" in self.csv_data.columns:
-                        self.csv_data["date"] = pd.to_datetime(
-                            self.csv_data["date"]
-                        ).dt.date
+                        self.csv_data["date"] = self.csv_data["date"].dt.date
 
                     # Aplicar mapeamento de nomes
                     if "teamname" in self.csv_data.columns:
                         self.csv_data["teamname_original"] = self.csv_data["teamname"]
-                        self.csv_data["teamname"] = self.csv_data["teamname"].apply(
-                            lambda x: self.map_team_name(x) if pd.notna(x) else x
+                        # Categórica: o mapeamento roda uma vez por nome distinto
+                        self.csv_data["teamname"] = self.csv_data["teamname"].map(
+                            self.map_team_name, na_action="ignore"
                         )
                         logger.info(
                             f"Aplicado mapeamento em {len(self.csv_data)} linhas do CSV"
@@ -8,19 +8,7 @@ from enum import Enum
 
 from colorama import Fore, Style
 
-# Mapeamento de nomes de times para LCKC e outras ligas
-TEAM_NAME_MAPPINGS = {
-    "BNK FearX": "BNK FEARX Youth",
-    "BNK FearX.Y": "BNK FEARX Youth",
-    "DN Freecs.Ch": "DN Freecs Challengers",
-    "DRX.Ch": "DRX Challengers",
-    "Dplus KIA.Ch": "Dplus KIA Challengers",
-    "Gen.G.GA": "Gen.G Global Academy",
-    "Hanwha Life Esports.Ch": "Hanwha Life Esports Challengers",
-    "KT Rolster.Ch": "KT Rolster Challengers",
-    "Nongshim.EA": "Nongshim Esports Academy",
-    "T1.EA": "T1 Esports Academy",
-}
+from src.shared.config.team_names import TEAM_NAME_MAPPINGS
 
 
 @dataclass
@@ -37,6 +25,10 @@ class Config:
     MAX_WORKERS = 4
     CACHE_SIZE = 128
     CONNECTION_TIMEOUT = 30
+    # Conexões por banco no pool (workers + thread principal)
+    POOL_SIZE = MAX_WORKERS + 1
+    # Bancos abertos somente leitura (URI mode=ro)
+    READ_ONLY_DBS = (DB_HISTORY,)
 
     # Business rules
     PARTICIPANT_ID_RANGE = (1, 10)  # Para players
@@ -4,56 +4,174 @@ Gerenciamento de conexões com banco de dados
 
 import sqlite3
 import threading
+import time
 from contextlib import contextmanager
-from typing import Dict
+from pathlib import Path
+from typing import Dict, List
 
 from .config import Config, setup_logger
 
 logger = setup_logger()
 
 
+class _DatabasePool:
+    """Conexões de um único banco: ociosas, criadas e espera por checkout"""
+
+    def __init__(self, db_path: str, max_size: int, read_only: bool):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.read_only = read_only
+        self.idle: List[sqlite3.Connection] = []
+        self.all: List[sqlite3.Connection] = []
+        self.available = threading.Condition()
+        self.stats = {"checkouts": 0, "waits": 0, "wait_seconds": 0.0, "max_wait": 0.0}
+
+    def connect(self) -> sqlite3.Connection:
+        if self.read_only:
+            # URI mode=ro: não cria o arquivo e nunca pega lock de escrita
+            target = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        else:
+            target = self.db_path
+
+        try:
+            # A conexão muda de thread entre checkouts, mas só uma a usa por vez
+            conn = sqlite3.connect(
+                target,
+                uri=self.read_only,
+                timeout=Config.CONNECTION_TIMEOUT,
+                check_same_thread=False,
+            )
+            # Otimizações SQLite
+            cursor = conn.cursor()
+            if self.read_only:
+                cursor.execute("PRAGMA query_only=ON")
+            else:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA cache_size=10000")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.close()
+        except Exception as e:
+            logger.error("Erro ao conectar com %s: %s", self.db_path, str(e))
+            raise
+        return conn
+
+    def checkout(self) -> sqlite3.Connection:
+        with self.available:
+            self.stats["checkouts"] += 1
+            if not self.idle and len(self.all) >= self.max_size:
+                start = time.perf_counter()
+                if not self.available.wait_for(
+                    lambda: self.idle, timeout=Config.CONNECTION_TIMEOUT
+                ):
+                    raise TimeoutError(
+                        f"Nenhuma conexão livre para {self.db_path} "
+                        f"após {Config.CONNECTION_TIMEOUT}s"
+                    )
+                waited = time.perf_counter() - start
+                self.stats["waits"] += 1
+                self.stats["wait_seconds"] += waited
+                self.stats["max_wait"] = max(self.stats["max_wait"], waited)
+
+            if self.idle:
+                return self.idle.pop()
+
+            conn = self.connect()
+            self.all.append(conn)
+            return conn
+
+    def release(self, conn: sqlite3.Connection):
+        with self.available:
+            self.idle.append(conn)
+            self.available.notify()
+
+
 class ConnectionPool:
-    """Pool de conexões para reutilização"""
+    """
+    Pool limitado de conexões por banco: cada thread faz checkout de uma
+    conexão exclusiva e a devolve ao sair do `with`. Bancos em
+    `read_only_paths` são abertos somente leitura.
+    """
+
+    def __init__(self, max_size: int = None, read_only_paths=None):
+        self.max_size = max_size or Config.POOL_SIZE
+        self.read_only_paths = set(
+            Config.READ_ONLY_DBS if read_only_paths is None else read_only_paths
+        )
+        self._pools: Dict[str, _DatabasePool] = {}
+        self._lock = threading.Lock()
+        # Conexão em uso por esta thread, por banco (uso aninhado reaproveita)
+        self._local = threading.local()
 
-    def __init__(self):
-        self._connections: Dict[str, sqlite3.Connection] = {}
-        self._lock = threading.RLock()
+    def _pool_for(self, db_path: str) -> _DatabasePool:
+        with self._lock:
+            pool = self._pools.get(db_path)
+            if pool is None:
+                pool = self._pools[db_path] = _DatabasePool(
+                    db_path, self.max_size, db_path in self.read_only_paths
+                )
+            return pool
 
     @contextmanager
     def get_connection(self, db_path: str):
-        """Context manager para obter conexão"""
-        with self._lock:
-            if db_path not in self._connections:
-                try:
-                    conn = sqlite3.connect(
-                        db_path,
-                        timeout=Config.CONNECTION_TIMEOUT,
-                        check_same_thread=False,
-                    )
-                    # Otimizações SQLite
-                    cursor = conn.cursor()
-                    cursor.execute("PRAGMA journal_mode=WAL")
-                    cursor.execute("PRAGMA synchronous=NORMAL")
-                    cursor.execute("PRAGMA cache_size=10000")
-                    cursor.execute("PRAGMA temp_store=MEMORY")
-                    cursor.close()
+        """Context manager para obter conexão exclusiva da thread atual"""
+        held = self._local.__dict__.setdefault("held", {})
+        if db_path in held:
+            yield held[db_path]
+            return
+
+        pool = self._pool_for(db_path)
+        conn = pool.checkout()
+        held[db_path] = conn
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            del held[db_path]
+            pool.release(conn)
 
-                    self._connections[db_path] = conn
-                except Exception as e:
-                    logger.error("Erro ao conectar com %s: %s", db_path, str(e))
-                    raise
+    def stats(self) -> Dict[str, dict]:
+        """Checkouts, esperas e conexões abertas por banco"""
+        with self._lock:
+            pools = list(self._pools.values())
+        return {
+            pool.db_path: {**pool.stats, "connections": len(pool.all)} for pool in pools
+        }
 
-            yield self._connections[db_path]
+    def log_stats(self):
+        for db_path, s in self.stats().items():
+            logger.info(
+                "Pool %s: %d checkouts, %d conexões, %d esperas (%.3fs, máx %.3fs)",
+                db_path,
+                s["checkouts"],
+                s["connections"],
+                s["waits"],
+                s["wait_seconds"],
+                s["max_wait"],
+            )
 
     def close_all(self):
         """Fecha todas as conexões"""
         with self._lock:
-            for db_path, conn in self._connections.items():
-                try:
-                    conn.close()
-                except Exception as e:
-                    logger.error("Erro ao fechar conexão %s: %s", db_path, str(e))
-            self._connections.clear()
+            pools = list(self._pools.values())
+            self._pools.clear()
+
+        for pool in pools:
+            with pool.available:
+                for conn in pool.all:
+                    try:
+                        conn.close()
+                    except Exception as e:
+                        logger.error(
+                            "Erro ao fechar conexão %s: %s", pool.db_path, str(e)
+                        )
+                pool.all.clear()
+                pool.idle.clear()
 
 
 # Instância global do pool
@@ -13,6 +13,37 @@ class Settings:
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", 300))
     REQUEST_TIMEOUT: int = 30
 
+    # Cliente HTTP: pool de conexões, keep-alive, HTTP/2 opcional e retries
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+    HTTP_MAX_KEEPALIVE: int = int(os.getenv("HTTP_MAX_KEEPALIVE", 10))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+    HTTP2: bool = os.getenv("HTTP2", "1") == "1"
+    HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", 3))
+    HTTP_BACKOFF_BASE: float = float(os.getenv("HTTP_BACKOFF_BASE", 0.5))
+    HTTP_BACKOFF_MAX: float = float(os.getenv("HTTP_BACKOFF_MAX", 20))
+
+    # Cache persistente de respostas (TTL do upcoming, em segundos; STALE é a
+    # janela extra em que a resposta vencida é servida enquanto revalida).
+    # prematch e result não têm TTL: só revalidação por ETag/304
+    HTTP_CACHE_ENABLED: bool = os.getenv("HTTP_CACHE_ENABLED", "1") == "1"
+    HTTP_CACHE_PATH: str = os.getenv(
+        "HTTP_CACHE_PATH",
+        str(Path(__file__).parent.parent.parent.parent / "data" / "http_cache.db"),
+    )
+    HTTP_CACHE_MAX_MB: int = int(os.getenv("HTTP_CACHE_MAX_MB", 200))
+    HTTP_CACHE_TTL_UPCOMING: int = int(os.getenv("HTTP_CACHE_TTL_UPCOMING", 1800))
+    HTTP_CACHE_STALE: int = int(os.getenv("HTTP_CACHE_STALE", 600))
+
+    # Cassete do Bet365Client: "record" grava respostas, "replay" responde do
+    # disco (com latência e erros artificiais), vazio = API real
+    BET365_CASSETTE_MODE: str = os.getenv("BET365_CASSETTE_MODE", "")
+    BET365_CASSETTE_DIR: str = os.getenv(
+        "BET365_CASSETTE_DIR",
+        str(Path(__file__).parent.parent.parent.parent / "data" / "cassettes"),
+    )
+    BET365_REPLAY_LATENCY: float = float(os.getenv("BET365_REPLAY_LATENCY", 0))
+    BET365_REPLAY_ERROR_RATE: float = float(os.getenv("BET365_REPLAY_ERROR_RATE", 0))
+
     # Paths (da nova versão)
     BASE_DIR = Path(__file__).parent.parent
     DATA_DIR = BASE_DIR / "data"
@@ -27,6 +58,25 @@ class Settings:
     # Database Settings (da nova versão)
     DB_TIMEOUT = 30
     DB_JOURNAL_MODE = "WAL"
+    # Pragmas das conexões do BaseDatabase (cache de páginas em KB, mmap em bytes)
+    DB_CACHE_SIZE_KB: int = int(os.getenv("DB_CACHE_SIZE_KB", 32768))
+    DB_MMAP_SIZE: int = int(os.getenv("DB_MMAP_SIZE", 256 * 1024 * 1024))
+    DB_CACHED_STATEMENTS: int = int(os.getenv("DB_CACHED_STATEMENTS", 256))
+
+    # raw_data das odds: "off", "event" (1 blob comprimido por evento) ou "row"
+    RAW_ODDS_POLICY: str = os.getenv("RAW_ODDS_POLICY", "event")
+
+    # Rate limit da API: rajada inicial e arquivo SQLite para dividir a cota
+    # entre processos (vazio = limite apenas no processo)
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", 0))
+    RATE_LIMIT_SHARED_PATH: str = os.getenv("RATE_LIMIT_SHARED_PATH", "")
+
+    # Agenda de coleta de odds: requisições reservadas para outros jobs e
+    # teto de eventos por execução (0 = limitado só pelo RateLimiter)
+    ODDS_REFRESH_RESERVE: int = int(os.getenv("ODDS_REFRESH_RESERVE", 50))
+    ODDS_REFRESH_MAX_PER_RUN: int = int(os.getenv("ODDS_REFRESH_MAX_PER_RUN", 0))
+    # Workers concorrentes buscando prematch
+    ODDS_FETCH_WORKERS: int = int(os.getenv("ODDS_FETCH_WORKERS", 10))
 
     # Garantir que diretórios existam
     def __init__(self):
@@ -0,0 +1,13 @@
+# Mapeamento de nomes de times para LCKC e outras ligas
+TEAM_NAME_MAPPINGS = {
+    "BNK FearX": "BNK FEARX Youth",
+    "BNK FearX.Y": "BNK FEARX Youth",
+    "DN Freecs.Ch": "DN Freecs Challengers",
+    "DRX.Ch": "DRX Challengers",
+    "Dplus KIA.Ch": "Dplus KIA Challengers",
+    "Gen.G.GA": "Gen.G Global Academy",
+    "Hanwha Life Esports.Ch": "Hanwha Life Esports Challengers",
+    "KT Rolster.Ch": "KT Rolster Challengers",
+    "Nongshim.EA": "Nongshim Esports Academy",
+    "T1.EA": "T1 Esports Academy",
+}
@@ -0,0 +1,118 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+class DatabaseExecutor:
+    """
+    Thread dedicada às operações de um banco SQLite.
+
+    As chamadas síncronas saem do event loop (as requisições HTTP em voo
+    continuam andando durante um commit) e ficam serializadas numa única
+    thread por arquivo, sem disputa de lock de escrita entre tarefas.
+    """
+
+    _executors: Dict[str, "DatabaseExecutor"] = {}
+    _executors_lock = threading.Lock()
+
+    def __init__(self, name: str):
+        self.name = name
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"db-{name}")
+        self.calls = 0
+        self.busy_seconds = 0.0
+
+    @classmethod
+    def for_database(cls, db_path) -> "DatabaseExecutor":
+        """Executor compartilhado do banco (um por caminho de arquivo)"""
+        key = str(Path(db_path).resolve())
+        with cls._executors_lock:
+            executor = cls._executors.get(key)
+            if executor is None:
+                executor = cls._executors[key] = cls(Path(key).stem)
+            return executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool, functools.partial(self._timed, fn, *args, **kwargs)
+        )
+
+    def _timed(self, fn: Callable, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.calls += 1
+            self.busy_seconds += time.perf_counter() - start
+
+
+class AsyncRepository:
+    """Proxy que expõe os métodos de um objeto de banco como corrotinas"""
+
+    def __init__(self, target: Any, executor: Optional[DatabaseExecutor] = None):
+        self._target = target
+        self._executor = executor or DatabaseExecutor.for_database(target.db_path)
+
+    @property
+    def sync(self) -> Any:
+        return self._target
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await self._executor.run(attr, *args, **kwargs)
+
+        return call
+
+
+class LoopLagMonitor:
+    """
+    Mede quanto o event loop fica travado: agenda um tick a cada `interval`
+    e registra o atraso com que ele realmente acorda.
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.02):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self.blocked_seconds = 0.0
+        self.stalls = 0
+        self.samples = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start - self.interval
+            self.samples += 1
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.threshold:
+                self.stalls += 1
+                self.blocked_seconds += lag
+
+    def report(self) -> str:
+        return (
+            f"Event loop: lag máx {self.max_lag * 1000:.0f}ms, "
+            f"{self.stalls} travadas > {self.threshold * 1000:.0f}ms "
+            f"somando {self.blocked_seconds:.2f}s ({self.samples} amostras)"
+        )
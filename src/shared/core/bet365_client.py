@@ -1,17 +1,91 @@
 import asyncio
+import importlib.util
+import json
+import logging
+import random
+import time
 from typing import Any, Dict, List, Optional
 
 import httpx
 
 from ..config.settings import settings
+from ..utils.metrics import EndpointMetrics
+from .cassette import RecordingTransport, ReplayTransport
 from .exceptions import BetsAPIError, RateLimitError
+from .response_cache import CachedResponse, ResponseCache
+
+logger = logging.getLogger("bet365_client")
 
 
 class Bet365Client:
-    def __init__(self):
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        rate_limiter=None,
+        transport: httpx.AsyncBaseTransport = None,
+        cache=None,
+    ):
         self.base_url = settings.BASE_URL
         self.api_key = settings.BETSAPI_API_KEY
-        self.client = httpx.AsyncClient(timeout=settings.REQUEST_TIMEOUT)
+        # Toda ida à rede (inclusive retries) passa pelo RateLimiter; respostas
+        # servidas do cache não consomem cota
+        self.rate_limiter = rate_limiter
+        # cache: ResponseCache, False para desligar, None = conforme settings
+        self.cache = self._default_cache() if cache is None else cache or None
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        self.max_retries = settings.HTTP_MAX_RETRIES
+        self.backoff_base = settings.HTTP_BACKOFF_BASE
+        self.backoff_max = settings.HTTP_BACKOFF_MAX
+        self.metrics = EndpointMetrics()
+
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        http2 = self._http2_available()
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.REQUEST_TIMEOUT),
+            limits=limits,
+            http2=http2,
+            transport=transport or self._cassette_transport(limits, http2),
+        )
+
+    @staticmethod
+    def _http2_available() -> bool:
+        # HTTP/2 exige o pacote opcional h2 (pip install httpx[http2])
+        return settings.HTTP2 and importlib.util.find_spec("h2") is not None
+
+    @staticmethod
+    def _default_cache() -> Optional[ResponseCache]:
+        if not settings.HTTP_CACHE_ENABLED:
+            return None
+        return ResponseCache(
+            settings.HTTP_CACHE_PATH,
+            ttls={"v1/bet365/upcoming": settings.HTTP_CACHE_TTL_UPCOMING},
+            # Odds e resultados velhos iriam para o odds_history/bets como se
+            # fossem atuais: só ETag/304, sempre com ida à rede
+            revalidate=("v3/bet365/prematch", "v1/bet365/result"),
+            stale_seconds=settings.HTTP_CACHE_STALE,
+            max_bytes=settings.HTTP_CACHE_MAX_MB * 1024 * 1024,
+        )
+
+    @staticmethod
+    def _cassette_transport(limits, http2: bool) -> Optional[httpx.AsyncBaseTransport]:
+        mode = settings.BET365_CASSETTE_MODE
+        if mode == "replay":
+            return ReplayTransport(
+                settings.BET365_CASSETTE_DIR,
+                latency=settings.BET365_REPLAY_LATENCY,
+                error_rate=settings.BET365_REPLAY_ERROR_RATE,
+            )
+        if mode == "record":
+            return RecordingTransport(
+                settings.BET365_CASSETTE_DIR,
+                httpx.AsyncHTTPTransport(limits=limits, http2=http2),
+            )
+        return None
 
     async def _make_request(
         self, endpoint: str, params: Dict[str, Any] = None
@@ -21,24 +95,144 @@ class Bet365Client:
 
         params["token"] = self.api_key
 
+        if not self.cache or not self.cache.caches(endpoint):
+            data, _ = await self._fetch(endpoint, params)
+            return data
+
+        key = self.cache.key(endpoint, params)
+        entry = self.cache.get(key)
+        if self.cache.must_revalidate(endpoint):
+            # Só If-None-Match: o corpo guardado volta apenas com 304 desta ida
+            self.cache.miss()
+            return await self._fetch_and_store(endpoint, params, key, entry)
+        if entry and self.cache.is_fresh(endpoint, entry):
+            self.cache.served(key, entry)
+            return json.loads(entry.body)
+        if entry and self.cache.is_servable_stale(endpoint, entry):
+            # Stale-while-revalidate: entrega já e atualiza em segundo plano
+            self.cache.served(key, entry, stale=True)
+            self._revalidate_in_background(endpoint, params, key, entry)
+            return json.loads(entry.body)
+
+        self.cache.miss()
+        return await self._fetch_and_store(endpoint, params, key, entry)
+
+    async def _fetch_and_store(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        key: str,
+        entry: Optional[CachedResponse],
+    ) -> Dict[str, Any]:
+        data, response = await self._fetch(
+            endpoint, params, etag=entry.etag if entry else None
+        )
+        if response.status_code == 304 and entry:
+            self.cache.touch(key)
+            return json.loads(entry.body)
+
+        self.cache.put(key, endpoint, response.content, response.headers.get("ETag"))
+        return data
+
+    def _revalidate_in_background(
+        self, endpoint: str, params: Dict[str, Any], key: str, entry: CachedResponse
+    ):
+        if key in self._revalidating:
+            return
+
+        async def revalidate():
+            try:
+                await self._fetch_and_store(endpoint, params, key, entry)
+            except BetsAPIError as e:
+                logger.debug(f"♻️  Revalidação de {key} falhou: {e}")
+
+        task = asyncio.create_task(revalidate())
+        self._revalidating[key] = task
+        task.add_done_callback(lambda _: self._revalidating.pop(key, None))
+
+    async def _fetch(
+        self, endpoint: str, params: Dict[str, Any], etag: Optional[str] = None
+    ):
+        """Requisição com retries; retorna (dados, resposta) — dados None em 304"""
+        headers = {"If-None-Match": etag} if etag else None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.metrics.retry(endpoint)
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+
+            try:
+                return await self._request_once(endpoint, params, headers)
+            except _RetryableError as e:
+                if attempt == self.max_retries:
+                    self.metrics.error(endpoint)
+                    raise e.error
+                delay = e.retry_after or self._backoff(attempt)
+                logger.debug(
+                    f"🔁 {endpoint}: {e.error} - nova tentativa em {delay:.1f}s "
+                    f"({attempt + 1}/{self.max_retries})"
+                )
+                await asyncio.sleep(delay)
+            except BetsAPIError:
+                self.metrics.error(endpoint)
+                raise
+
+    async def _request_once(
+        self, endpoint: str, params: Dict[str, Any], headers: Optional[Dict] = None
+    ):
+        start = time.perf_counter()
         try:
             response = await self.client.get(
-                f"{self.base_url}/{endpoint}", params=params
+                f"{self.base_url}/{endpoint}", params=params, headers=headers
             )
-            response.raise_for_status()
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            raise _RetryableError(BetsAPIError(f"HTTP error: {str(e)}"))
+        except httpx.HTTPError as e:
+            raise BetsAPIError(f"HTTP error: {str(e)}")
+        finally:
+            self.metrics.observe(endpoint, time.perf_counter() - start)
 
+        if response.status_code == 304:
+            return None, response
+
+        if response.status_code in self.RETRY_STATUS:
+            error_cls = RateLimitError if response.status_code == 429 else BetsAPIError
+            raise _RetryableError(
+                error_cls(f"HTTP error: {response.status_code}"),
+                self._retry_after(response),
+            )
+
+        try:
+            response.raise_for_status()
             data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise BetsAPIError(f"HTTP error: {str(e)}")
 
-            if data.get("success") == 0:
-                error_msg = data.get("error", "Unknown error")
-                if "rate limit" in error_msg.lower():
-                    raise RateLimitError(error_msg)
-                raise BetsAPIError(error_msg)
+        if data.get("success") == 0:
+            error_msg = data.get("error", "Unknown error")
+            if "rate limit" in error_msg.lower():
+                raise _RetryableError(RateLimitError(error_msg))
+            raise BetsAPIError(error_msg)
 
-            return data
+        return data, response
 
-        except httpx.HTTPError as e:
-            raise BetsAPIError(f"HTTP error: {str(e)}")
+    def _backoff(self, attempt: int) -> float:
+        """Exponencial com full jitter: uniforme em [0, min(max, base * 2^n)]"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _retry_after(self, response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        try:
+            return min(float(value), self.backoff_max) if value else None
+        except ValueError:
+            return None
+
+    def latency_report(self) -> List[str]:
+        lines = self.metrics.report()
+        if self.cache:
+            lines.append(self.cache.report())
+        return lines
 
     # Bet365 InPlay
     async def inplay(self) -> Dict[str, Any]:
@@ -100,4 +294,17 @@ class Bet365Client:
         return await self._make_request("v1/bet365/result", params)
 
     async def close(self):
+        if self._revalidating:
+            await asyncio.gather(*self._revalidating.values(), return_exceptions=True)
         await self.client.aclose()
+        if self.cache:
+            self.cache.close()
+
+
+class _RetryableError(Exception):
+    """Falha transitória (429/5xx/timeout/rate limit) que merece nova tentativa"""
+
+    def __init__(self, error: BetsAPIError, retry_after: Optional[float] = None):
+        super().__init__(str(error))
+        self.error = error
+        self.retry_after = retry_after
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import random
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+MANIFEST = "_cassette.json"
+DEFAULT_NAME = "_default"
+DAY_FORMAT = "%Y%m%d"
+
+
+def cassette_path(directory: Path, endpoint: str, params: Dict[str, str]) -> Path:
+    """Arquivo da resposta: <endpoint>/<params ordenados>.json (sem o token)"""
+    folder = directory / endpoint.strip("/").replace("/", "_")
+    items = sorted((k, v) for k, v in params.items() if k != "token")
+    name = "&".join(f"{k}={v}" for k, v in items) or DEFAULT_NAME
+    return folder / f"{re.sub(r'[^A-Za-z0-9=&._-]', '_', name)}.json"
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Repassa as requisições ao transporte real e grava os corpos 200 em disco"""
+
+    def __init__(self, directory, inner: httpx.AsyncBaseTransport):
+        self.directory = Path(directory)
+        self.inner = inner
+        self.recorded = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = self.directory / MANIFEST
+        if not manifest.exists():
+            manifest.write_text(
+                json.dumps({"recorded_at": datetime.now().strftime(DAY_FORMAT)})
+            )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        if response.status_code != 200:
+            return response
+
+        content = await response.aread()
+        path = cassette_path(self.directory, request.url.path, dict(request.url.params))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        self.recorded += 1
+
+        return httpx.Response(
+            response.status_code, headers=response.headers, content=content
+        )
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Responde a partir de um diretório gravado, sem rede.
+
+    - `latency`/`jitter`: atraso artificial por requisição (segundos)
+    - `error_rate`: fração de requisições que recebem 503 (exercita retries)
+    - Parâmetros `day` são deslocados pela diferença entre a data da gravação
+      e hoje, para que "próximos 10 dias" continue apontando para o corpus.
+    - Sem gravação exata, usa `<endpoint>/_default.json` se existir.
+    """
+
+    def __init__(
+        self,
+        directory,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.directory = Path(directory)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.day_offset = self._day_offset()
+        self._bodies: Dict[Path, Optional[bytes]] = {}
+        self.stats = {"hits": 0, "misses": 0, "errors": 0}
+
+    def _day_offset(self) -> timedelta:
+        manifest = self.directory / MANIFEST
+        if not manifest.exists():
+            return timedelta(0)
+        recorded_at = json.loads(manifest.read_text()).get("recorded_at")
+        if not recorded_at:
+            return timedelta(0)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return datetime.strptime(recorded_at, DAY_FORMAT) - today
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return httpx.Response(503, request=request)
+
+        body = self._lookup(request.url.path, dict(request.url.params))
+        if body is None:
+            self.stats["misses"] += 1
+            return httpx.Response(
+                404,
+                json={"success": 0, "error": "not recorded"},
+                request=request,
+            )
+
+        self.stats["hits"] += 1
+        return httpx.Response(
+            200,
+            content=body,
+            headers={"Content-Type": "application/json"},
+            request=request,
+        )
+
+    def _lookup(self, endpoint: str, params: Dict[str, str]) -> Optional[bytes]:
+        if "day" in params and self.day_offset:
+            day = datetime.strptime(params["day"], DAY_FORMAT) + self.day_offset
+            params = {**params, "day": day.strftime(DAY_FORMAT)}
+
+        for path in (
+            cassette_path(self.directory, endpoint, params),
+            cassette_path(self.directory, endpoint, {}),
+        ):
+            if path not in self._bodies:
+                self._bodies[path] = path.read_bytes() if path.exists() else None
+            if self._bodies[path] is not None:
+                return self._bodies[path]
+        return None
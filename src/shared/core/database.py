@@ -1,25 +1,126 @@
 import sqlite3
+import threading
 from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Tuple
+
+from src.shared.config.settings import settings
+
+# Conexões abertas por thread, uma por (arquivo, somente leitura)
+_local = threading.local()
+
+
+def _thread_pool() -> Dict[Tuple[str, bool], sqlite3.Connection]:
+    pool = getattr(_local, "connections", None)
+    if pool is None:
+        pool = _local.connections = {}
+    return pool
+
+
+def _thread_depths() -> Dict[str, int]:
+    depths = getattr(_local, "depths", None)
+    if depths is None:
+        depths = _local.depths = {}
+    return depths
+
+
+def connect(db_path, read_only: bool = False) -> sqlite3.Connection:
+    """
+    Abre uma conexão nova com os pragmas do projeto: WAL, synchronous NORMAL,
+    busy_timeout, cache de páginas, mmap e cache de statements preparados.
+    `read_only` abre via URI `mode=ro` (não cria o arquivo nem pega lock de escrita).
+    """
+    if read_only:
+        conn = sqlite3.connect(
+            f"{Path(db_path).resolve().as_uri()}?mode=ro",
+            uri=True,
+            timeout=settings.DB_TIMEOUT,
+            cached_statements=settings.DB_CACHED_STATEMENTS,
+        )
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        conn = sqlite3.connect(
+            str(db_path),
+            timeout=settings.DB_TIMEOUT,
+            cached_statements=settings.DB_CACHED_STATEMENTS,
+        )
+        conn.execute(f"PRAGMA journal_mode = {settings.DB_JOURNAL_MODE}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+
+    conn.execute(f"PRAGMA cache_size = -{settings.DB_CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute(f"PRAGMA mmap_size = {settings.DB_MMAP_SIZE}")
+    return conn
+
+
+def pooled_connection(db_path, read_only: bool = False) -> sqlite3.Connection:
+    """Conexão reaproveitada pela thread atual (aberta na primeira chamada)"""
+    key = (str(db_path), read_only)
+    pool = _thread_pool()
+    conn = pool.get(key)
+    if conn is None:
+        conn = pool[key] = connect(db_path, read_only)
+    return conn
+
+
+def get_read_only_connection(db_path) -> sqlite3.Connection:
+    """
+    Conexão somente leitura do pool da thread. Não deve ser fechada por quem
+    chama: a próxima consulta na mesma thread reaproveita a conexão.
+    """
+    conn = pooled_connection(db_path, read_only=True)
+    conn.row_factory = None
+    return conn
+
+
+@contextmanager
+def read_only_connection(db_path):
+    yield get_read_only_connection(db_path)
+
+
+def close_connections(db_path=None):
+    """Fecha as conexões da thread atual (de um arquivo ou todas)"""
+    pool = _thread_pool()
+    for key in [k for k in pool if db_path is None or k[0] == str(db_path)]:
+        pool.pop(key).close()
 
 
 class BaseDatabase:
     """Classe base para gerenciamento de bancos SQLite com conexões reutilizáveis"""
 
-    def __init__(self, db_name: str):
-        data_dir = Path(__file__).parent.parent.parent.parent / "data"
-        data_dir.mkdir(exist_ok=True)
+    def __init__(self, db_name: str, data_dir=None):
+        data_dir = Path(data_dir or Path(__file__).parent.parent.parent.parent / "data")
+        data_dir.mkdir(parents=True, exist_ok=True)
         self.db_path = str(data_dir / db_name)
 
     @contextmanager
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
+        """
+        Transação na conexão da thread atual: commit ao sair, rollback em erro.
+        Chamadas aninhadas na mesma thread participam da transação de fora.
+        """
+        conn = pooled_connection(self.db_path)
+        depths = _thread_depths()
+        if depths.get(self.db_path):
+            yield conn
+            return
+
+        depths[self.db_path] = 1
         try:
             yield conn
             conn.commit()
-        except Exception:
+        except BaseException:
+            # A conexão volta para o pool: nunca deixar transação aberta
             conn.rollback()
             raise
         finally:
-            conn.close()
+            depths[self.db_path] = 0
+
+    @contextmanager
+    def get_read_connection(self):
+        """Conexão somente leitura (URI mode=ro) para consultas e relatórios"""
+        yield get_read_only_connection(self.db_path)
+
+    def close(self):
+        close_connections(self.db_path)
@@ -0,0 +1,108 @@
+STAT_TYPES = ("kills", "towers", "dragons", "barons", "inhibitors")
+
+# Últimos mapas do time com o total (casa + fora) de cada estatística.
+# Valores vazios contam 0; só entram números decimais simples (espaços nas
+# pontas, sinal opcional, ao menos um dígito e no máximo um ponto) e
+# inhibitors zerados são ignorados antes de numerar, como no processamento
+# antigo em Python.
+TEAM_MAP_TOTALS_SQL = """
+    WITH team AS (
+        SELECT team_id FROM teams WHERE name = ? LIMIT 1
+    ),
+    recent_matches AS (
+        SELECT id FROM matches
+        WHERE (home_team_id = (SELECT team_id FROM team)
+               OR away_team_id = (SELECT team_id FROM team))
+        AND time_status = 3
+        {match_filters}
+        ORDER BY event_time DESC
+        LIMIT ?
+    ),
+    map_values AS (
+        SELECT ms.map_id, ms.stat_name,
+               COALESCE(ms.home_value, '') AS home,
+               TRIM(COALESCE(ms.home_value, '')) AS home_trimmed,
+               LTRIM(TRIM(COALESCE(ms.home_value, '')), '+-') AS home_digits,
+               COALESCE(ms.away_value, '') AS away,
+               TRIM(COALESCE(ms.away_value, '')) AS away_trimmed,
+               LTRIM(TRIM(COALESCE(ms.away_value, '')), '+-') AS away_digits
+        FROM recent_matches rm
+        JOIN game_maps gm ON gm.match_id = rm.id
+        JOIN map_statistics ms ON ms.map_id = gm.id
+        WHERE ms.stat_name IN ({stat_placeholders})
+    ),
+    map_totals AS (
+        SELECT map_id, stat_name,
+               CAST(home AS REAL) + CAST(away AS REAL) AS total
+        FROM map_values
+        WHERE (home = ''
+               OR (LENGTH(home_trimmed) - LENGTH(home_digits) <= 1
+                   AND home_digits GLOB '*[0-9]*'
+                   AND home_digits NOT GLOB '*[^0-9.]*'
+                   AND home_digits NOT GLOB '*.*.*'))
+        AND (away = ''
+             OR (LENGTH(away_trimmed) - LENGTH(away_digits) <= 1
+                 AND away_digits GLOB '*[0-9]*'
+                 AND away_digits NOT GLOB '*[^0-9.]*'
+                 AND away_digits NOT GLOB '*.*.*'))
+    ),
+    ranked AS (
+        SELECT stat_name, total,
+               ROW_NUMBER() OVER (PARTITION BY stat_name ORDER BY map_id DESC) AS rn
+        FROM map_totals
+        WHERE NOT (stat_name = 'inhibitors' AND total = 0)
+    )
+    SELECT stat_name, total FROM ranked
+    WHERE rn <= ?
+    ORDER BY stat_name, rn
+"""
+
+
+def team_map_totals_query(
+    team_name: str,
+    stat_types,
+    limit: int,
+    match_limit: int,
+    since: str | None = None,
+    require_score: bool = True,
+) -> tuple[str, list]:
+    """TEAM_MAP_TOTALS_SQL formatada e seus parâmetros"""
+    stat_types = list(stat_types)
+    match_filters = []
+    params = [team_name]
+    if require_score:
+        match_filters.append("AND final_score IS NOT NULL")
+    if since is not None:
+        match_filters.append("AND event_time >= ?")
+        params.append(since)
+    params += [match_limit, *stat_types, limit]
+
+    query = TEAM_MAP_TOTALS_SQL.format(
+        match_filters="\n        ".join(match_filters),
+        stat_placeholders=",".join("?" * len(stat_types)),
+    )
+    return query, params
+
+
+def query_team_map_totals(
+    conn,
+    team_name: str,
+    stat_types,
+    limit: int,
+    match_limit: int,
+    since: str | None = None,
+    require_score: bool = True,
+) -> dict[str, list[float]]:
+    """
+    Uma consulta por time: {stat_type: totais dos últimos `limit` mapas},
+    do mais recente para o mais antigo, a partir das `match_limit` últimas partidas
+    (a partir de `since`, no formato de event_time, quando informado).
+    """
+    stat_types = list(stat_types)
+    query, params = team_map_totals_query(
+        team_name, stat_types, limit, match_limit, since, require_score
+    )
+    totals = {stat_type: [] for stat_type in stat_types}
+    for stat_name, total in conn.execute(query, params):
+        totals[stat_name].append(total)
+    return totals
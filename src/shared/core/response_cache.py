@@ -0,0 +1,174 @@
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: Optional[str]
+    age: float
+
+
+class ResponseCache:
+    """
+    Cache persistente (SQLite) das respostas da API, compartilhado entre
+    execuções do cron.
+
+    - TTL por endpoint; dentro de `stale_seconds` após vencer a resposta
+      ainda é servida enquanto é revalidada em segundo plano
+    - ETag guardado para revalidação condicional (If-None-Match / 304)
+    - Endpoints em `revalidate` (odds e resultados) nunca são servidos sem ida
+      à rede: o corpo guardado só é reaproveitado quando a API responde 304
+    - Tamanho limitado a `max_bytes`, descartando as menos acessadas (LRU)
+    """
+
+    def __init__(
+        self,
+        path,
+        ttls: Dict[str, int],
+        revalidate: Iterable[str] = (),
+        default_ttl: int = 300,
+        stale_seconds: int = 600,
+        max_bytes: int = 200 * 1024 * 1024,
+    ):
+        self.path = Path(path)
+        self.ttls = ttls
+        self.revalidate = frozenset(revalidate)
+        self.default_ttl = default_ttl
+        self.stale_seconds = stale_seconds
+        self.max_bytes = max_bytes
+        self.stats = {
+            "hits": 0,
+            "stale": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "evicted": 0,
+            "bytes_saved": 0,
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_http_cache_access ON http_cache (last_access)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM http_cache"
+        ).fetchone()[0]
+
+    @staticmethod
+    def key(endpoint: str, params: Dict) -> str:
+        items = sorted((k, str(v)) for k, v in params.items() if k != "token")
+        return endpoint + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+    def caches(self, endpoint: str) -> bool:
+        return endpoint in self.ttls or endpoint in self.revalidate
+
+    def must_revalidate(self, endpoint: str) -> bool:
+        return endpoint in self.revalidate
+
+    def ttl(self, endpoint: str) -> int:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        row = self._conn.execute(
+            "SELECT body, etag, stored_at FROM http_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        body, etag, stored_at = row
+        return CachedResponse(body, etag, time.time() - stored_at)
+
+    def is_fresh(self, endpoint: str, entry: CachedResponse) -> bool:
+        return entry.age <= self.ttl(endpoint)
+
+    def is_servable_stale(self, endpoint: str, entry: CachedResponse) -> bool:
+        return entry.age <= self.ttl(endpoint) + self.stale_seconds
+
+    def served(self, key: str, entry: CachedResponse, stale: bool = False):
+        """Registra uma resposta entregue do cache (hit ou stale)"""
+        self.stats["stale" if stale else "hits"] += 1
+        self.stats["bytes_saved"] += len(entry.body)
+        self._conn.execute(
+            "UPDATE http_cache SET last_access = ? WHERE key = ?", (time.time(), key)
+        )
+        self._conn.commit()
+
+    def miss(self):
+        self.stats["misses"] += 1
+
+    def touch(self, key: str):
+        """304: o conteúdo guardado continua válido, renova o TTL"""
+        self.stats["revalidated"] += 1
+        now = time.time()
+        self._conn.execute(
+            "UPDATE http_cache SET stored_at = ?, last_access = ? WHERE key = ?",
+            (now, now, key),
+        )
+        self._conn.commit()
+
+    def put(self, key: str, endpoint: str, body: bytes, etag: Optional[str] = None):
+        now = time.time()
+        previous = self._conn.execute(
+            "SELECT size FROM http_cache WHERE key = ?", (key,)
+        ).fetchone()
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO http_cache
+                (key, endpoint, body, etag, stored_at, last_access, size)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            (key, endpoint, body, etag, now, now, len(body)),
+        )
+        self._total_bytes += len(body) - (previous[0] if previous else 0)
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+        self._conn.commit()
+
+    def _evict(self):
+        """Remove as entradas menos acessadas até ficar em 90% do limite"""
+        target = self.max_bytes * 0.9
+        cursor = self._conn.execute(
+            "SELECT key, size FROM http_cache ORDER BY last_access ASC"
+        )
+        victims = []
+        for key, size in cursor:
+            if self._total_bytes <= target:
+                break
+            victims.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM http_cache WHERE key = ?", victims)
+        self.stats["evicted"] += len(victims)
+
+    def hit_ratio(self) -> float:
+        served = self.stats["hits"] + self.stats["stale"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+    def report(self) -> str:
+        s = self.stats
+        return (
+            f"Cache HTTP: {self.hit_ratio():.0%} de acerto "
+            f"({s['hits']} hits, {s['stale']} stale, {s['misses']} misses, "
+            f"{s['revalidated']} revalidadas por 304, {s['evicted']} descartadas), "
+            f"{s['bytes_saved'] / 1024 / 1024:.1f} MB economizados"
+        )
+
+    def close(self):
+        self._conn.close()
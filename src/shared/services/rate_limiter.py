@@ -1,33 +1,138 @@
 import asyncio
+import math
+import sqlite3
+import threading
 import time
+from pathlib import Path
 
 
 class RateLimiter:
-    def __init__(self, max_requests=3500, time_window=3600):
+    """
+    Token bucket no formato GCRA: o estado é um único instante teórico de
+    chegada (TAT), então `acquire` é O(1).
+
+    - `burst` requisições podem sair de imediato; o restante é liberado a
+      (max_requests - burst) / time_window por segundo, o que mantém qualquer
+      janela de `time_window` segundos dentro de `max_requests`.
+    - Cada chamada reserva seu horário antes de dormir, sem segurar lock, então
+      os pedidos acordam na ordem em que chegaram (FIFO).
+    - Com `shared_path`, o TAT fica num SQLite compartilhado e processos
+      distintos (ex.: cron de odds e de histórico) dividem a mesma cota. A
+      reserva espera o lock do SQLite numa thread, fora do event loop.
+
+    Diferente da janela deslizante antiga (que liberava as `max_requests` de
+    uma vez), a rajada padrão é 10% da cota: o resto da cota vira vazão
+    contínua. Quem precisar da rajada grande define RATE_LIMIT_BURST.
+    """
+
+    def __init__(
+        self,
+        max_requests=3500,
+        time_window=3600,
+        burst=None,
+        shared_path=None,
+        name="bet365",
+    ):
+        if max_requests <= 0 or time_window <= 0:
+            raise ValueError(
+                f"Cota inválida: {max_requests} requisições em {time_window}s"
+            )
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests = []
-        self.lock = asyncio.Lock()
+        self.burst = max(1, min(burst or max_requests // 10, max_requests - 1))
+        # Cota de 1 requisição: sem rajada extra, uma a cada time_window
+        refill = max_requests - self.burst if max_requests > self.burst else max_requests
+        self.interval = time_window / refill
+        self.tolerance = (self.burst - 1) * self.interval
+        self.name = name
+        self.shared_path = Path(shared_path) if shared_path else None
+
+        # Relógio de parede no modo compartilhado (comparável entre processos)
+        self._clock = time.time if self.shared_path else time.monotonic
+        self._tat = 0.0
+        self.total_requests = 0
+        self.total_wait = 0.0
+
+        if self.shared_path:
+            self._shared_lock = threading.Lock()
+            self._init_shared()
 
     async def acquire(self):
-        async with self.lock:
-            now = time.time()
-            self.requests = [
-                req_time
-                for req_time in self.requests
-                if now - req_time < self.time_window
-            ]
-
-            if len(self.requests) >= self.max_requests:
-                oldest_req = min(self.requests)
-                wait_time = self.time_window - (now - oldest_req)
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time)
-                    now = time.time()
-                    self.requests = [
-                        req_time
-                        for req_time in self.requests
-                        if now - req_time < self.time_window
-                    ]
-
-            self.requests.append(now)
+        if self.shared_path:
+            # BEGIN IMMEDIATE pode esperar até 30s pelo outro processo
+            wait = await asyncio.to_thread(self._reserve_shared)
+        else:
+            wait = self._reserve()
+        self.total_requests += 1
+        if wait > 0:
+            self.total_wait += wait
+            await asyncio.sleep(wait)
+
+    def available(self) -> int:
+        """Quantas requisições podem sair agora sem espera"""
+        now = self._clock()
+        tat = max(self._read_tat(), now)
+        return max(0, math.floor((now + self.tolerance - tat) / self.interval + 1e-9) + 1)
+
+    def _reserve(self) -> float:
+        """Reserva o próximo horário livre e retorna quanto esperar até ele"""
+        if self.shared_path:
+            return self._reserve_shared()
+
+        now = self._clock()
+        tat = max(self._tat, now)
+        self._tat = tat + self.interval
+        return max(0.0, tat - self.tolerance - now)
+
+    def _init_shared(self):
+        self.shared_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.shared_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        # Estado descartável: perder a última reserva num crash é inofensivo
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                name TEXT PRIMARY KEY,
+                tat REAL NOT NULL
+            )
+        """
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO rate_limits (name, tat) VALUES (?, 0)", (self.name,)
+        )
+
+    def _read_tat(self) -> float:
+        if not self.shared_path:
+            return self._tat
+        row = self._conn.execute(
+            "SELECT tat FROM rate_limits WHERE name = ?", (self.name,)
+        ).fetchone()
+        return row[0] if row else 0.0
+
+    def _reserve_shared(self) -> float:
+        with self._shared_lock:
+            return self._reserve_shared_locked()
+
+    def _reserve_shared_locked(self) -> float:
+        conn = self._conn
+        try:
+            # IMMEDIATE serializa a leitura+escrita do TAT entre processos
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT tat FROM rate_limits WHERE name = ?", (self.name,)
+            ).fetchone()
+            now = self._clock()
+            tat = max(row[0] if row else 0.0, now)
+            conn.execute(
+                "UPDATE rate_limits SET tat = ? WHERE name = ?",
+                (tat + self.interval, self.name),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return max(0.0, tat - self.tolerance - now)
@@ -0,0 +1,120 @@
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+class TeamRegistry:
+    """
+    Cache em processo de times: team_id externo -> (id interno, nome).
+
+    Carrega a tabela `teams` uma única vez por banco e por processo, responde
+    as consultas da memória e insere em lote apenas os times inéditos.
+    """
+
+    _registries: Dict[str, "TeamRegistry"] = {}
+    _registries_lock = threading.Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._teams: Dict[str, tuple] = {}
+        self._warm = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.inserted = 0
+
+    @classmethod
+    def for_database(cls, db_path) -> "TeamRegistry":
+        """Registro compartilhado do banco (um por caminho de arquivo)"""
+        key = str(Path(db_path).resolve())
+        with cls._registries_lock:
+            registry = cls._registries.get(key)
+            if registry is None:
+                registry = cls._registries[key] = cls(key)
+            return registry
+
+    def resolve(self, conn, team: Dict) -> int:
+        """Id interno de um time; `team` tem team_id, name e colunas extras opcionais"""
+        return self.resolve_many(conn, [team])[team["team_id"]]
+
+    def resolve_many(self, conn, teams: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Resolve vários times de uma vez. Os inéditos são inseridos na transação
+        de `conn` com as colunas presentes no dict (team_id, name, ...).
+        """
+        with self._lock:
+            if not self._warm:
+                self._load(conn)
+
+            resolved: Dict[str, int] = {}
+            missing: Dict[str, Dict] = {}
+            for team in teams:
+                team_id = team["team_id"]
+                if team_id in resolved or team_id in missing:
+                    continue
+                cached = self._teams.get(team_id)
+                if cached:
+                    self.hits += 1
+                    resolved[team_id] = cached[0]
+                else:
+                    self.misses += 1
+                    missing[team_id] = team
+
+            if missing:
+                resolved.update(self._insert(conn, list(missing.values())))
+
+            return resolved
+
+    def name(self, team_id: str) -> Optional[str]:
+        cached = self._teams.get(team_id)
+        return cached[1] if cached else None
+
+    def invalidate(self):
+        """Descarta o cache (ex.: após rollback ou limpeza de times órfãos)"""
+        with self._lock:
+            self._teams.clear()
+            self._warm = False
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "teams": len(self._teams),
+            "hits": self.hits,
+            "misses": self.misses,
+            "inserted": self.inserted,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _load(self, conn):
+        self._teams = {
+            team_id: (id_, name)
+            for id_, team_id, name in conn.execute("SELECT id, team_id, name FROM teams")
+        }
+        self._warm = True
+
+    def _insert(self, conn, teams: List[Dict], chunk_size: int = 500) -> Dict[str, int]:
+        # Agrupa por conjunto de colunas para um executemany por formato
+        by_columns: Dict[tuple, List[Dict]] = {}
+        for team in teams:
+            by_columns.setdefault(tuple(team), []).append(team)
+
+        for columns, group in by_columns.items():
+            cursor = conn.executemany(
+                f"INSERT OR IGNORE INTO teams ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                [tuple(team[column] for column in columns) for team in group],
+            )
+            self.inserted += max(cursor.rowcount, 0)
+
+        team_ids = [team["team_id"] for team in teams]
+        resolved = {}
+        for i in range(0, len(team_ids), chunk_size):
+            chunk = team_ids[i : i + chunk_size]
+            cursor = conn.execute(
+                f"SELECT id, team_id, name FROM teams WHERE team_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for id_, team_id, name in cursor:
+                self._teams[team_id] = (id_, name)
+                resolved[team_id] = id_
+        return resolved
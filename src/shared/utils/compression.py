@@ -0,0 +1,51 @@
+import json
+import zlib
+from typing import Any
+
+try:
+    import zstandard
+except ImportError:  # dependência opcional
+    zstandard = None
+
+# Prefixo identifica o codec para que blobs antigos continuem legíveis
+ZSTD_PREFIX = b"zs:"
+ZLIB_PREFIX = b"zl:"
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def compress_json(payload: Any, codec: str = None) -> bytes:
+    """Serializa em JSON compacto e comprime (zstd se instalado, senão zlib)"""
+    codec = codec or default_codec()
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard não está instalado")
+        return ZSTD_PREFIX + zstandard.ZstdCompressor(level=3).compress(raw)
+    if codec == "zlib":
+        return ZLIB_PREFIX + zlib.compress(raw, 6)
+
+    raise ValueError(f"Codec desconhecido: {codec}")
+
+
+def decompress_json(blob) -> Any:
+    """Inverso de compress_json; aceita também o JSON em texto do formato antigo"""
+    if blob is None:
+        return None
+    if isinstance(blob, str):
+        return json.loads(blob)
+
+    blob = bytes(blob)
+    if blob.startswith(ZSTD_PREFIX):
+        if zstandard is None:
+            raise RuntimeError("zstandard não está instalado")
+        raw = zstandard.ZstdDecompressor().decompress(blob[len(ZSTD_PREFIX) :])
+    elif blob.startswith(ZLIB_PREFIX):
+        raw = zlib.decompress(blob[len(ZLIB_PREFIX) :])
+    else:
+        raw = blob
+
+    return json.loads(raw.decode("utf-8"))
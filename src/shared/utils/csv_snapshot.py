@@ -0,0 +1,205 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+MANIFEST = "manifest.json"
+# Pasta temporária de gravação mais velha que isso é lixo de uma gravação interrompida
+STALE_TMP_SECONDS = 6 * 3600
+
+# Colunas do database.csv usadas por get_bets e get_results; o resto do CSV
+# nem é lido. Textos viram categorias (códigos int32 + lista de nomes).
+PLAYER_HISTORY_COLUMNS = {
+    "playername": "category",
+    "teamname": "category",
+    "league": "category",
+    "position": "category",
+    "side": "category",
+    "gameid": "category",
+    "date": "datetime",
+    "game": "float",
+    "participantid": "float",
+    "kills": "float",
+    "deaths": "float",
+    "assists": "float",
+    "dragons": "float",
+    "barons": "float",
+    "towers": "float",
+    "inhibitors": "float",
+    "gamelength": "float",
+}
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CsvSnapshot:
+    """
+    Cópia colunar tipada de um CSV grande em arquivos .npy (um por coluna),
+    carregados com memmap. Fica em `<csv>.snapshot/` ao lado do CSV e é
+    refeita quando o CSV muda (mtime/tamanho e, se só o mtime mudou, hash).
+    """
+
+    def __init__(self, csv_path, columns: Dict[str, str] = PLAYER_HISTORY_COLUMNS):
+        self.csv_path = Path(csv_path)
+        self.columns = columns
+        self.directory = self.csv_path.with_name(self.csv_path.name + ".snapshot")
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            manifest = json.loads((self.directory / MANIFEST).read_text())
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != SNAPSHOT_VERSION:
+            return None
+        if set(manifest.get("requested", ())) != set(self.columns):
+            return None
+        return manifest
+
+    def _is_fresh(self, manifest: dict) -> bool:
+        st = self.csv_path.stat()
+        if (manifest["csv_mtime_ns"], manifest["csv_size"]) == (st.st_mtime_ns, st.st_size):
+            return True
+        if manifest["csv_size"] != st.st_size or manifest["csv_hash"] != file_hash(self.csv_path):
+            return False
+        # Só o mtime mudou (cópia/touch): o conteúdo é o mesmo
+        manifest["csv_mtime_ns"] = st.st_mtime_ns
+        self._write_manifest(manifest)
+        return True
+
+    def _write_manifest(self, manifest: dict):
+        tmp = self.directory / f"{MANIFEST}.{os.getpid()}"
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, self.directory / MANIFEST)
+
+    def load(self, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """DataFrame com as colunas pedidas (todas as do snapshot por padrão)"""
+        manifest = self._read_manifest()
+        if manifest is None or not self._is_fresh(manifest):
+            logger.info(f"🔄 Snapshot de {self.csv_path.name} desatualizado, convertendo o CSV...")
+            df = self._read_csv()
+            try:
+                manifest = self._write(df)
+            except OSError as e:
+                logger.warning(f"⚠️ Não foi possível gravar o snapshot: {e}")
+                return df[[c for c in columns if c in df.columns]] if columns else df
+        try:
+            return self._load_columns(manifest, columns)
+        except FileNotFoundError:
+            # Outro processo trocou o snapshot duas vezes desde a leitura do manifest
+            current = self._read_manifest()
+            if current is None or current["data_dir"] == manifest["data_dir"]:
+                raise
+            return self._load_columns(current, columns)
+
+    def _read_csv(self) -> pd.DataFrame:
+        df = pd.read_csv(self.csv_path, usecols=lambda c: c in self.columns, low_memory=False)
+        for name in df.columns:
+            kind = self.columns[name]
+            if kind == "category":
+                values = df[name]
+                df[name] = pd.Categorical(values.astype(str).where(values.notna()))
+            elif kind == "datetime":
+                df[name] = pd.to_datetime(df[name], errors="coerce")
+            else:
+                df[name] = pd.to_numeric(df[name], errors="coerce").astype(float)
+        return df
+
+    def _write(self, df: pd.DataFrame) -> dict:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        previous = self._read_manifest()
+        st = self.csv_path.stat()
+        csv_hash = file_hash(self.csv_path)
+
+        # Grava numa pasta nova e troca o manifest no fim: leitores concorrentes
+        # continuam vendo o snapshot anterior até a troca
+        tmp_dir = self.directory / f"{csv_hash}.tmp{os.getpid()}"
+        tmp_dir.mkdir(exist_ok=True)
+        columns = {}
+        for name in df.columns:
+            kind = self.columns[name]
+            if kind == "category":
+                np.save(tmp_dir / f"{name}.npy", df[name].cat.codes.to_numpy(dtype=np.int32))
+                columns[name] = {"kind": kind, "categories": df[name].cat.categories.tolist()}
+            elif kind == "datetime":
+                np.save(tmp_dir / f"{name}.npy", df[name].to_numpy(dtype="datetime64[ns]"))
+                columns[name] = {"kind": kind}
+            else:
+                np.save(tmp_dir / f"{name}.npy", df[name].to_numpy(dtype=np.float64))
+                columns[name] = {"kind": kind}
+
+        data_dir = self.directory / csv_hash
+        if data_dir.exists():
+            shutil.rmtree(tmp_dir)
+        else:
+            os.replace(tmp_dir, data_dir)
+
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "csv_mtime_ns": st.st_mtime_ns,
+            "csv_size": st.st_size,
+            "csv_hash": csv_hash,
+            "data_dir": csv_hash,
+            "rows": len(df),
+            "requested": sorted(self.columns),
+            "columns": columns,
+        }
+        self._write_manifest(manifest)
+
+        # A geração anterior fica até a próxima gravação: quem leu o manifest
+        # antigo ainda pode estar abrindo os .npy dela
+        keep = {csv_hash, previous["data_dir"] if previous else None}
+        for old in self.directory.iterdir():
+            if not old.is_dir() or old.name in keep:
+                continue
+            if ".tmp" not in old.name or self._is_abandoned(old):
+                shutil.rmtree(old, ignore_errors=True)
+        logger.info(f"💾 Snapshot gravado: {len(df)} linhas, {len(columns)} colunas")
+        return manifest
+
+    @staticmethod
+    def _is_abandoned(tmp_dir: Path) -> bool:
+        """Pasta `<hash>.tmp<pid>` de uma gravação interrompida (processo morto ou antiga)"""
+        try:
+            if time.time() - tmp_dir.stat().st_mtime > STALE_TMP_SECONDS:
+                return True
+            pid = int(tmp_dir.name.rsplit(".tmp", 1)[1])
+        except (OSError, ValueError):
+            return True
+        if pid == os.getpid():
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+
+    def _load_columns(self, manifest: dict, columns: Optional[Iterable[str]]) -> pd.DataFrame:
+        data_dir = self.directory / manifest["data_dir"]
+        names = [c for c in (columns or manifest["columns"]) if c in manifest["columns"]]
+        data = {}
+        for name in names:
+            meta = manifest["columns"][name]
+            values = np.load(data_dir / f"{name}.npy", mmap_mode="r")
+            if meta["kind"] == "category":
+                data[name] = pd.Categorical.from_codes(values, meta["categories"])
+            else:
+                data[name] = values
+        return pd.DataFrame(data, copy=False)
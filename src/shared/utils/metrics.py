@@ -0,0 +1,81 @@
+import bisect
+from typing import Dict, List
+
+# Limites superiores dos buckets, em milissegundos
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """Histograma de latência com buckets fixos (memória constante)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float:
+        """Estimativa pelo limite superior do bucket que contém o percentil"""
+        if not self.count:
+            return 0.0
+        target = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                if i < len(self.buckets):
+                    return min(self.buckets[i], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+        }
+
+
+class EndpointMetrics:
+    """Latência, erros e retries agrupados por endpoint"""
+
+    def __init__(self):
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+
+    def observe(self, endpoint: str, seconds: float):
+        histogram = self.latency.get(endpoint)
+        if histogram is None:
+            histogram = self.latency[endpoint] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def error(self, endpoint: str):
+        self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def retry(self, endpoint: str):
+        self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def report(self) -> List[str]:
+        lines = []
+        for endpoint in sorted(self.latency.keys() | self.errors.keys()):
+            histogram = self.latency.get(endpoint) or LatencyHistogram()
+            s = histogram.summary()
+            lines.append(
+                f"{endpoint}: {s['count']} req, média {s['avg_ms']:.0f}ms, "
+                f"p50 {s['p50_ms']:.0f}ms, p95 {s['p95_ms']:.0f}ms, "
+                f"p99 {s['p99_ms']:.0f}ms, máx {s['max_ms']:.0f}ms, "
+                f"retries {self.retries.get(endpoint, 0)}, erros {self.errors.get(endpoint, 0)}"
+            )
+        return lines